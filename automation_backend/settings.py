@@ -205,6 +205,29 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# autodiscover_tasks() only imports runner.tasks; the enhanced tasks live in their own module
+CELERY_IMPORTS = ("runner.enhanced_tasks",)
+CELERY_TASK_ROUTES = {
+    # File-heavy cleanup runs on its own queue so it cannot starve automation workers
+    "runner.enhanced_tasks.cleanup_task_batch": {"queue": "io"},
+}
+# Seconds between staff dashboard refreshes; the cached copy lives twice as long
+# (runner.dashboard.DASHBOARD_CACHE_TIMEOUT) so a late beat never leaves it cold
+DASHBOARD_REFRESH_INTERVAL = 120
+CELERY_BEAT_SCHEDULE = {
+    "precompute-dashboard": {
+        "task": "runner.enhanced_tasks.precompute_dashboard",
+        "schedule": float(DASHBOARD_REFRESH_INTERVAL),
+    },
+}
+
+# Cache (daily reports and other derived data)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/2",
+    }
+}
 
 # Logging
 LOGGING = {
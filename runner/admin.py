@@ -74,8 +74,8 @@ class CaptchaEventAdmin(admin.ModelAdmin):
 
 @admin.register(AutomationLog)
 class AutomationLogAdmin(admin.ModelAdmin):
-    list_display = ['id', 'task', 'level', 'message_short', 'timestamp']
-    list_filter = ['level', 'timestamp', 'module']
+    list_display = ['id', 'task', 'level', 'category', 'message_short', 'timestamp']
+    list_filter = ['level', 'category', 'timestamp', 'module']
     search_fields = ['message', 'module', 'function']
     readonly_fields = ['id', 'timestamp']
     
@@ -21,10 +21,11 @@ class AIContentAnalyzer:
         self.task = task
         self.analysis_cache = {}
     
-    def analyze_page_intelligence(self, url: str) -> Dict[str, Any]:
+    def analyze_page_intelligence(self, url: str, page_source: Optional[str] = None) -> Dict[str, Any]:
         """Comprehensive AI-powered page analysis"""
         try:
-            page_source = self.driver.page_source
+            if page_source is None:
+                page_source = self.driver.page_source
             soup = BeautifulSoup(page_source, 'html.parser')
             
             analysis = {
@@ -34,7 +35,7 @@ class AIContentAnalyzer:
                 'interaction_patterns': self._analyze_interaction_patterns(soup),
                 'accessibility_score': self._assess_accessibility(soup),
                 'seo_indicators': self._analyze_seo_indicators(soup),
-                'security_indicators': self._analyze_security_indicators(soup),
+                'security_indicators': self._analyze_security_indicators(soup, url),
                 'performance_indicators': self._analyze_performance_indicators(soup),
                 'recommendations': []
             }
@@ -417,7 +418,7 @@ class AIContentAnalyzer:
         
         return seo
     
-    def _analyze_security_indicators(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_security_indicators(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Analyze security indicators"""
         security = {
             'score': 0.0,
@@ -428,8 +429,7 @@ class AIContentAnalyzer:
         indicators = {}
         
         # Check for HTTPS
-        current_url = self.driver.current_url
-        indicators['https'] = current_url.startswith('https://')
+        indicators['https'] = url.startswith('https://')
         
         # Check for security headers (basic check)
         security_headers = ['content-security-policy', 'x-frame-options', 'x-xss-protection']
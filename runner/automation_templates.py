@@ -1,7 +1,9 @@
 """
 Pre-built automation templates for common use cases
 """
+import copy
 import logging
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from .models import AutomationTask
 
@@ -22,7 +24,9 @@ class AutomationTemplate:
     
     def customize(self, **kwargs) -> Dict[str, Any]:
         """Customize template with user parameters"""
-        config = self.config.copy()
+        # Deep copy: subclasses mutate the nested 'config' dict and template
+        # instances are shared across requests via get_template_manager()
+        config = copy.deepcopy(self.config)
         config.update(kwargs)
         return config
 
@@ -279,6 +283,7 @@ class TemplateManager:
             'social_media': SocialMediaMonitoringTemplate(),
             'form_testing': FormTestingTemplate()
         }
+        self._template_list = None
     
     def get_template(self, template_name: str) -> Optional[AutomationTemplate]:
         """Get a specific template by name"""
@@ -286,6 +291,11 @@ class TemplateManager:
     
     def list_templates(self) -> List[Dict[str, str]]:
         """List all available templates"""
+        if self._template_list is None:
+            self._template_list = self._build_template_list()
+        return self._template_list
+    
+    def _build_template_list(self) -> List[Dict[str, str]]:
         return [
             {
                 'name': template.name,
@@ -295,16 +305,15 @@ class TemplateManager:
             for key, template in self.templates.items()
         ]
     
-    def create_task_from_template(self, template_name: str, user, **customizations) -> AutomationTask:
-        """Create an AutomationTask from a template"""
+    def build_task(self, template_name: str, user, **customizations) -> AutomationTask:
+        """Build an unsaved AutomationTask from a template"""
         template = self.get_template(template_name)
         if not template:
             raise ValueError(f"Template '{template_name}' not found")
         
         config = template.customize(**customizations)
         
-        # Create the task
-        task = AutomationTask.objects.create(
+        return AutomationTask(
             name=config.get('name', template.name),
             description=config.get('description', template.description),
             start_url=config.get('start_url', ''),
@@ -318,7 +327,11 @@ class TemplateManager:
             config=config.get('config', {}),
             created_by=user
         )
-        
+    
+    def create_task_from_template(self, template_name: str, user, **customizations) -> AutomationTask:
+        """Create an AutomationTask from a template"""
+        task = self.build_task(template_name, user, **customizations)
+        task.save()
         return task
     
     def get_template_recommendations(self, url: str, page_content: str = None) -> List[str]:
@@ -354,16 +367,22 @@ class TemplateManager:
         
         return recommendations[:3]  # Return top 3 recommendations
 
+@lru_cache(maxsize=None)
+def get_template_manager() -> TemplateManager:
+    """Return the process-wide TemplateManager; templates are static"""
+    return TemplateManager()
+
+
 # Compatibility functions for the views
 def get_available_templates() -> dict:
     """Returns a simplified list of available templates."""
-    manager = TemplateManager()
+    manager = get_template_manager()
     templates = manager.list_templates()
     return {template['name']: {'name': template['name'], 'description': template['description']} for template in templates}
 
 def get_template_config(template_key: str) -> dict:
     """Returns the default configuration for a given template key."""
-    manager = TemplateManager()
+    manager = get_template_manager()
     template = manager.get_template(template_key)
     if template:
         return template.get_config()
@@ -371,5 +390,5 @@ def get_template_config(template_key: str) -> dict:
 
 def recommend_templates(url: str, content_keywords: list = None) -> list:
     """Simulates AI-powered template recommendation based on URL and content keywords."""
-    manager = TemplateManager()
+    manager = get_template_manager()
     return manager.get_template_recommendations(url)
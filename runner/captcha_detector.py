@@ -4,6 +4,7 @@ Advanced CAPTCHA detection and handling system
 import re
 import logging
 import time
+from itertools import chain
 from typing import Dict, List, Any, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,6 +14,12 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 logger = logging.getLogger(__name__)
 
 
+def _iframe_src_selector(pattern: str) -> str:
+    """CSS equivalent of an iframe_patterns regex (an escaped hostname/path), matched case-insensitively"""
+    literal = re.sub(r'\\(.)', r'\1', pattern)
+    return f'iframe[src*="{literal}" i]'
+
+
 class AdvancedCaptchaDetector:
     """Advanced CAPTCHA detection system"""
     
@@ -20,6 +27,18 @@ class AdvancedCaptchaDetector:
         self.driver = driver
         self.detection_patterns = self._load_detection_patterns()
         self.confidence_threshold = 0.7
+        self._all_selectors = ', '.join(chain(
+            (
+                selector
+                for patterns in self.detection_patterns.values()
+                for selector in patterns.get('selectors', [])
+            ),
+            (
+                _iframe_src_selector(pattern)
+                for patterns in self.detection_patterns.values()
+                for pattern in patterns.get('iframe_patterns', [])
+            ),
+        ))
     
     def _load_detection_patterns(self) -> Dict[str, Dict[str, Any]]:
         """Load comprehensive CAPTCHA detection patterns"""
@@ -350,23 +369,64 @@ class AdvancedCaptchaDetector:
             "Implement proper error handling"
         ])
     
-    def wait_for_captcha_completion(self, timeout: int = 30) -> bool:
+    def has_captcha_markup(self) -> bool:
+        """Cheap pre-check: does the page contain any known CAPTCHA selector or iframe source?"""
+        try:
+            return bool(self.driver.execute_script(
+                "return document.querySelector(arguments[0]) !== null;",
+                self._all_selectors
+            ))
+        except Exception:
+            # Let the full detector decide if the probe fails
+            return True
+    
+    def _fast_still_present(self, captcha_type: str) -> bool:
+        """Cheap single-round-trip check for the selectors of a CAPTCHA type"""
+        selectors = self.detection_patterns.get(captcha_type, {}).get('selectors', [])
+        if not selectors:
+            return False
+        
+        union_selector = ', '.join(selectors)
+        try:
+            return bool(self.driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length > 0;",
+                union_selector
+            ))
+        except Exception:
+            # Fall back to the full detection path if the probe fails
+            return False
+    
+    def wait_for_captcha_completion(self, timeout: int = 30,
+                                    detection: Optional[Dict[str, Any]] = None) -> bool:
         """Wait for CAPTCHA to be completed automatically (for some types)"""
         try:
             start_time = time.time()
             
-            while time.time() - start_time < timeout:
-                # Check if CAPTCHA is still present
+            # Reuse the caller's detection snapshot when available
+            if detection is None:
                 detection = self.detect_captcha()
-                if not detection['detected']:
-                    logger.info("CAPTCHA appears to have been completed")
-                    return True
+            if not detection['detected']:
+                logger.info("CAPTCHA appears to have been completed")
+                return True
+            
+            captcha_type = detection['type']
+            delay = 0.25
+            max_delay = min(4.0, max(timeout / 4, delay))
+            
+            while time.time() - start_time < timeout:
+                # Only run the full confidence scan once the cheap probe stops matching
+                if not self._fast_still_present(captcha_type):
+                    detection = self.detect_captcha()
+                    if not detection['detected']:
+                        logger.info("CAPTCHA appears to have been completed")
+                        return True
+                    captcha_type = detection['type']
                 
-                # For Cloudflare, wait a bit longer
-                if detection['type'] == 'cloudflare':
-                    time.sleep(2)
-                else:
-                    time.sleep(1)
+                remaining = timeout - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, max_delay)
             
             logger.warning(f"CAPTCHA still present after {timeout} seconds")
             return False
@@ -0,0 +1,124 @@
+"""
+Precomputed dashboard data for the enhanced task API
+"""
+import operator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Count, Avg, Sum, FloatField
+from django.db.models.functions import Cast, NullIf
+
+from .models import AutomationTask
+from .serializers import AutomationTaskListSerializer
+
+DASHBOARD_CACHE_PREFIX = 'dashboard'
+DASHBOARD_REFRESH_INTERVAL = getattr(settings, 'DASHBOARD_REFRESH_INTERVAL', 120)  # seconds, beat schedule for the staff view
+DASHBOARD_CACHE_TIMEOUT = 2 * DASHBOARD_REFRESH_INTERVAL
+
+# Columns read by AutomationTaskListSerializer, including the nested users;
+# skips the config JSON and free-text columns on dashboard slices
+_USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name')
+TASK_LIST_FIELDS = (
+    'id', 'name', 'description', 'start_url', 'status', 'priority',
+    'created_at', 'started_at', 'finished_at', 'duration_seconds',
+    'total_pages_visited', 'total_errors',
+    *(f'created_by__{field}' for field in _USER_FIELDS),
+    *(f'assigned_to__{field}' for field in _USER_FIELDS),
+)
+
+# (metric, comparison, threshold, message) evaluated by evaluate_insights()
+DASHBOARD_INSIGHT_RULES = [
+    ('average_success_rate', operator.lt, 70,
+     "Low success rate detected - consider reviewing task configurations"),
+    ('total_captcha_detections', operator.gt, 10,
+     "High CAPTCHA detection rate - consider implementing solving strategies"),
+    ('active_tasks', operator.gt, 5,
+     "High number of active tasks - monitor system resources"),
+]
+
+
+def evaluate_insights(rules, metrics: dict) -> list:
+    """Messages for every rule whose metric crosses its threshold"""
+    return [
+        message for metric, compare, threshold, message in rules
+        if compare(metrics.get(metric) or 0, threshold)
+    ]
+
+
+def visible_tasks(user, queryset=None):
+    """Tasks ``user`` may see: everything for staff, own or assigned otherwise"""
+    if queryset is None:
+        queryset = AutomationTask.objects.all()
+
+    if not user.is_staff:
+        queryset = queryset.filter(Q(created_by=user) | Q(assigned_to=user))
+
+    # Serializers nest both user FKs; join them to avoid per-row lookups
+    return queryset.select_related('created_by', 'assigned_to')
+
+
+def dashboard_cache_key(user=None) -> str:
+    """Staff share one dashboard since they all see every task"""
+    scope = 'staff' if user is None or user.is_staff else user.pk
+    return f'{DASHBOARD_CACHE_PREFIX}:{scope}'
+
+
+def compute_dashboard(queryset) -> dict:
+    """Build the database-derived part of the dashboard for ``queryset``"""
+    # Status counts and run totals in one pass; task rows carry
+    # denormalized run totals, so no stats join is needed
+    counts = queryset.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status__in=['PENDING', 'RUNNING'])),
+        completed=Count('id', filter=Q(status='COMPLETED')),
+        failed=Count('id', filter=Q(status='FAILED')),
+        captcha=Count('id', filter=Q(status='CAPTCHA_DETECTED')),
+        total_pages=Sum('total_pages_visited'),
+        total_captchas=Sum('total_captcha_detections'),
+        # Mean per-task success rate (%); tasks that never visited a page
+        # divide by NULL and are left out of the average
+        avg_success=Avg(
+            Cast('total_successful_requests', FloatField()) * 100
+            / NullIf('total_pages_visited', 0)
+        ),
+    )
+
+    # Recent activity
+    recent_tasks = queryset.only(*TASK_LIST_FIELDS).order_by('-created_at')[:10]
+    recent_serializer = AutomationTaskListSerializer(recent_tasks, many=True)
+
+    summary = {
+        'total_tasks': counts['total'],
+        'active_tasks': counts['active'],
+        'completed_tasks': counts['completed'],
+        'failed_tasks': counts['failed'],
+        'captcha_tasks': counts['captcha'],
+        'total_pages_visited': counts.get('total_pages') or 0,
+        'total_captcha_detections': counts.get('total_captchas') or 0,
+        'average_success_rate': round(counts.get('avg_success') or 0, 2)
+    }
+
+    return {
+        'summary': summary,
+        'ai_insights': evaluate_insights(DASHBOARD_INSIGHT_RULES, summary),
+        'recent_tasks': recent_serializer.data
+    }
+
+
+def refresh_dashboard(user=None) -> dict:
+    """Recompute and cache a dashboard; ``None`` refreshes the shared staff view"""
+    if user is None:
+        queryset = AutomationTask.objects.select_related('created_by', 'assigned_to')
+    else:
+        queryset = visible_tasks(user)
+    data = compute_dashboard(queryset)
+    cache.set(dashboard_cache_key(user), data, timeout=DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def get_dashboard(user) -> dict:
+    """Cached dashboard for ``user``, computed on a miss"""
+    data = cache.get(dashboard_cache_key(user))
+    if data is None:
+        data = refresh_dashboard(user)
+    return data
@@ -4,9 +4,12 @@ Advanced data extraction modules for web automation
 import re
 import json
 import logging
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Union
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlsplit
+import soupsieve as sv
+from bs4 import BeautifulSoup, Tag
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -14,6 +17,121 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 logger = logging.getLogger(__name__)
 
+# lxml (already a project requirement) parses several times faster than html.parser
+_HTML_PARSER = 'lxml'
+
+# Pre-compiled patterns shared by all extractors
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PHONE_PATTERNS = [
+    r'\+?1?[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',
+    r'\+?[0-9]{1,3}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,9}',
+    r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
+]
+# Single alternation so the page text is scanned once instead of per pattern
+_PHONE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in _PHONE_PATTERNS))
+_PRICE_RE = re.compile(r'([\$€£¥₹])?\s*([\d,]+(?:\.\d+)?)')
+_RATING_RE = re.compile(r'\d+(?:\.\d+)?')
+_OG_PREFIX_RE = re.compile(r'^og:')
+
+# Keyword lookups compiled into one alternation each, so the text is scanned once
+_AVAILABILITY_INDICATORS = [
+    'in stock', 'out of stock', 'available', 'unavailable',
+    'pre-order', 'coming soon', 'discontinued'
+]
+_AVAILABILITY_RE = re.compile('|'.join(
+    re.escape(indicator)
+    for indicator in sorted(_AVAILABILITY_INDICATORS, key=len, reverse=True)
+))
+_LANGUAGE_WORDS = {
+    'en': ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'],
+    'es': ['el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo', 'le']
+}
+_ENGLISH_WORDS = frozenset(_LANGUAGE_WORDS['en'])
+_SPANISH_WORDS = frozenset(_LANGUAGE_WORDS['es'])
+_WORD_RE = re.compile(r'\w+')
+_LANGUAGE_MARGIN = 5
+
+_HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+# CSS selectors compiled once instead of re-parsed on every select() call
+# Address selectors are combined so each matching element is visited and read once
+_ADDRESS_SELECTOR = sv.compile(', '.join((
+    '[itemprop="address"]',
+    '.address',
+    '.location',
+    '[class*="address"]',
+    '[class*="location"]'
+)))
+_TITLE_SELECTORS = [sv.compile(selector) for selector in (
+    'h1[class*="title"]',
+    'h1[class*="product"]',
+    '.product-title',
+    '.product-name',
+    'h1'
+)]
+_PRICE_SELECTORS = [sv.compile(selector) for selector in (
+    '[class*="price"]',
+    '[class*="cost"]',
+    '[itemprop="price"]',
+    '.price'
+)]
+_DESCRIPTION_SELECTORS = [sv.compile(selector) for selector in (
+    '[class*="description"]',
+    '[class*="summary"]',
+    '[itemprop="description"]',
+    '.product-description'
+)]
+_RATING_SELECTORS = [sv.compile(selector) for selector in (
+    '[class*="rating"]',
+    '[class*="star"]',
+    '[itemprop="ratingValue"]'
+)]
+_REQUIRED_FIELD_SELECTOR = sv.compile('input[required], textarea[required]')
+_CAPTCHA_SELECTOR = sv.compile('iframe[class*="captcha" i], div[class*="captcha" i]')
+
+_SOCIAL_PLATFORMS = {
+    'facebook': ['facebook.com', 'fb.com'],
+    'twitter': ['twitter.com', 'x.com'],
+    'linkedin': ['linkedin.com'],
+    'instagram': ['instagram.com'],
+    'youtube': ['youtube.com', 'youtu.be'],
+    'tiktok': ['tiktok.com'],
+    'pinterest': ['pinterest.com']
+}
+_SOCIAL_DOMAIN_PLATFORM = {
+    domain: platform for platform, domains in _SOCIAL_PLATFORMS.items() for domain in domains
+}
+# One scan per href finds the platform instead of testing every domain in turn
+_SOCIAL_DOMAIN_RE = re.compile('|'.join(
+    re.escape(domain) for domain in sorted(_SOCIAL_DOMAIN_PLATFORM, key=len, reverse=True)
+))
+
+_CONTENT_TAGS = [
+    'html', 'title', 'meta', 'a', 'img', 'form', 'table', 'article', 'iframe'
+] + _HEADING_TAGS
+
+
+def _collect_elements(soup: BeautifulSoup, tags: List[str]) -> Dict[str, List[Tag]]:
+    """Bucket every element of the given tag names in a single tree walk"""
+    elements = {tag: [] for tag in tags}
+    for elem in soup.find_all(tags):
+        elements[elem.name].append(elem)
+    return elements
+
+
+@lru_cache(maxsize=4096)
+def _netloc(url: str) -> str:
+    """Cached netloc lookup; navigation links repeat on every page of a crawl"""
+    return urlsplit(url).netloc
+
+
+def _find_meta(elements: Dict[str, List[Tag]], name: str) -> Optional[Tag]:
+    """Return the first collected <meta> tag with the given name"""
+    for tag in elements['meta']:
+        if tag.get('name') == name:
+            return tag
+    return None
+
 
 class DataExtractor:
     """Base class for data extraction"""
@@ -23,23 +141,29 @@ class DataExtractor:
         self.task = task
         self.extracted_data = {}
     
-    def extract(self, url: str) -> Dict[str, Any]:
+    def extract(self, url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """Main extraction method to be overridden"""
         raise NotImplementedError
+    
+    def _get_soup(self, soup: Optional[BeautifulSoup] = None) -> BeautifulSoup:
+        """Reuse a tree parsed by the caller, parsing the live page only when none is given"""
+        if soup is None:
+            soup = BeautifulSoup(self.driver.page_source, _HTML_PARSER)
+        return soup
 
 
 class ContactInfoExtractor(DataExtractor):
     """Extract contact information from web pages"""
     
-    def extract(self, url: str) -> Dict[str, Any]:
+    def extract(self, url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """Extract contact information"""
         try:
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            soup = self._get_soup(soup)
+            text = soup.get_text(' ')
             
             contact_data = {
-                'emails': self._extract_emails(soup),
-                'phones': self._extract_phones(soup),
+                'emails': self._extract_emails(soup, text),
+                'phones': self._extract_phones(soup, text),
                 'addresses': self._extract_addresses(soup),
                 'social_links': self._extract_social_links(soup),
                 'contact_forms': self._extract_contact_forms(soup)
@@ -51,70 +175,37 @@ class ContactInfoExtractor(DataExtractor):
             logger.error(f"Error extracting contact info from {url}: {e}")
             return {}
     
-    def _extract_emails(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_emails(self, soup: BeautifulSoup, text: str) -> List[str]:
         """Extract email addresses"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        text = soup.get_text()
-        emails = re.findall(email_pattern, text)
-        return list(set(emails))
+        return list({match.group() for match in _EMAIL_RE.finditer(text)})
     
-    def _extract_phones(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_phones(self, soup: BeautifulSoup, text: str) -> List[str]:
         """Extract phone numbers"""
-        phone_patterns = [
-            r'\+?1?[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',
-            r'\+?[0-9]{1,3}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,4}[-.\s]?[0-9]{1,9}',
-            r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'
-        ]
-        
-        text = soup.get_text()
-        phones = []
-        for pattern in phone_patterns:
-            phones.extend(re.findall(pattern, text))
-        
-        return list(set(phones))
+        return list({match.group() for match in _PHONE_RE.finditer(text)})
     
     def _extract_addresses(self, soup: BeautifulSoup) -> List[str]:
         """Extract addresses"""
         # Look for common address patterns
-        address_selectors = [
-            '[itemprop="address"]',
-            '.address',
-            '.location',
-            '[class*="address"]',
-            '[class*="location"]'
-        ]
-        
         addresses = []
-        for selector in address_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                address_text = element.get_text(strip=True)
-                if len(address_text) > 10:  # Basic length filter
-                    addresses.append(address_text)
+        seen = set()
+        for element in _ADDRESS_SELECTOR.select(soup):
+            address_text = element.get_text(strip=True)
+            if len(address_text) > 10 and address_text not in seen:  # Basic length filter
+                seen.add(address_text)
+                addresses.append(address_text)
         
         return addresses
     
     def _extract_social_links(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Extract social media links"""
-        social_platforms = {
-            'facebook': ['facebook.com', 'fb.com'],
-            'twitter': ['twitter.com', 'x.com'],
-            'linkedin': ['linkedin.com'],
-            'instagram': ['instagram.com'],
-            'youtube': ['youtube.com', 'youtu.be'],
-            'tiktok': ['tiktok.com'],
-            'pinterest': ['pinterest.com']
-        }
-        
         social_links = {}
         links = soup.find_all('a', href=True)
         
         for link in links:
             href = link['href']
-            for platform, domains in social_platforms.items():
-                if any(domain in href.lower() for domain in domains):
-                    social_links[platform] = href
-                    break
+            match = _SOCIAL_DOMAIN_RE.search(href.lower())
+            if match:
+                social_links[_SOCIAL_DOMAIN_PLATFORM[match.group()]] = href
         
         return social_links
     
@@ -148,18 +239,18 @@ class ContactInfoExtractor(DataExtractor):
 class ProductInfoExtractor(DataExtractor):
     """Extract product information from e-commerce pages"""
     
-    def extract(self, url: str) -> Dict[str, Any]:
+    def extract(self, url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """Extract product information"""
         try:
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            soup = self._get_soup(soup)
+            text_lower = soup.get_text(' ').casefold()
             
             product_data = {
                 'title': self._extract_title(soup),
                 'price': self._extract_price(soup),
                 'description': self._extract_description(soup),
-                'images': self._extract_images(soup),
-                'availability': self._extract_availability(soup),
+                'images': self._extract_images(soup, url),
+                'availability': self._extract_availability(soup, text_lower),
                 'reviews': self._extract_reviews(soup),
                 'specifications': self._extract_specifications(soup)
             }
@@ -172,16 +263,8 @@ class ProductInfoExtractor(DataExtractor):
     
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """Extract product title"""
-        selectors = [
-            'h1[class*="title"]',
-            'h1[class*="product"]',
-            '.product-title',
-            '.product-name',
-            'h1'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
+        for selector in _TITLE_SELECTORS:
+            element = selector.select_one(soup)
             if element:
                 return element.get_text(strip=True)
         
@@ -197,41 +280,29 @@ class ProductInfoExtractor(DataExtractor):
         }
         
         # Look for price elements
-        price_selectors = [
-            '[class*="price"]',
-            '[class*="cost"]',
-            '[itemprop="price"]',
-            '.price'
-        ]
-        
-        for selector in price_selectors:
-            elements = soup.select(selector)
+        for selector in _PRICE_SELECTORS:
+            elements = selector.select(soup)
             for element in elements:
                 text = element.get_text(strip=True)
-                price_match = re.search(r'[\$€£¥₹]?[\d,]+\.?\d*', text)
+                price_match = _PRICE_RE.search(text)
                 if price_match:
-                    price_data['current'] = price_match.group()
-                    break
+                    # Stop at the first price found instead of scanning every selector
+                    price_data['current'] = price_match.group(0)
+                    price_data['currency'] = price_match.group(1) or ''
+                    return price_data
         
         return price_data
     
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Extract product description"""
-        selectors = [
-            '[class*="description"]',
-            '[class*="summary"]',
-            '[itemprop="description"]',
-            '.product-description'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
+        for selector in _DESCRIPTION_SELECTORS:
+            element = selector.select_one(soup)
             if element:
                 return element.get_text(strip=True)
         
         return ""
     
-    def _extract_images(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_images(self, soup: BeautifulSoup, url: str) -> List[str]:
         """Extract product images"""
         images = []
         img_elements = soup.find_all('img')
@@ -243,21 +314,16 @@ class ProductInfoExtractor(DataExtractor):
                 if src.startswith('//'):
                     src = 'https:' + src
                 elif src.startswith('/'):
-                    src = urljoin(self.driver.current_url, src)
+                    src = urljoin(url, src)
                 images.append(src)
         
         return images
     
-    def _extract_availability(self, soup: BeautifulSoup) -> str:
+    def _extract_availability(self, soup: BeautifulSoup, text_lower: str) -> str:
         """Extract availability status"""
-        availability_indicators = [
-            'in stock', 'out of stock', 'available', 'unavailable',
-            'pre-order', 'coming soon', 'discontinued'
-        ]
-        
-        text = soup.get_text().lower()
-        for indicator in availability_indicators:
-            if indicator in text:
+        found = set(_AVAILABILITY_RE.findall(text_lower))
+        for indicator in _AVAILABILITY_INDICATORS:
+            if indicator in found:
                 return indicator.title()
         
         return "Unknown"
@@ -271,17 +337,11 @@ class ProductInfoExtractor(DataExtractor):
         }
         
         # Look for rating elements
-        rating_selectors = [
-            '[class*="rating"]',
-            '[class*="star"]',
-            '[itemprop="ratingValue"]'
-        ]
-        
-        for selector in rating_selectors:
-            element = soup.select_one(selector)
+        for selector in _RATING_SELECTORS:
+            element = selector.select_one(soup)
             if element:
                 text = element.get_text(strip=True)
-                rating_match = re.search(r'[\d.]+', text)
+                rating_match = _RATING_RE.search(text)
                 if rating_match:
                     review_data['rating'] = rating_match.group()
                     break
@@ -310,21 +370,22 @@ class ProductInfoExtractor(DataExtractor):
 class ContentAnalyzer(DataExtractor):
     """Analyze page content for various patterns"""
     
-    def extract(self, url: str) -> Dict[str, Any]:
+    def extract(self, url: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """Analyze page content"""
         try:
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            soup = self._get_soup(soup)
+            text = soup.get_text(' ')
+            elements = _collect_elements(soup, _CONTENT_TAGS)
             
             analysis = {
-                'content_type': self._analyze_content_type(soup),
-                'language': self._detect_language(soup),
-                'keywords': self._extract_keywords(soup),
-                'headings': self._extract_headings(soup),
-                'links': self._analyze_links(soup),
-                'images': self._analyze_images(soup),
-                'forms': self._analyze_forms(soup),
-                'metadata': self._extract_metadata(soup)
+                'content_type': self._analyze_content_type(elements),
+                'language': self._detect_language(elements, text),
+                'keywords': self._extract_keywords(elements),
+                'headings': self._extract_headings(elements),
+                'links': self._analyze_links(elements, url),
+                'images': self._analyze_images(elements),
+                'forms': self._analyze_forms(elements),
+                'metadata': self._extract_metadata(elements)
             }
             
             return analysis
@@ -333,37 +394,47 @@ class ContentAnalyzer(DataExtractor):
             logger.error(f"Error analyzing content from {url}: {e}")
             return {}
     
-    def _analyze_content_type(self, soup: BeautifulSoup) -> str:
+    def _analyze_content_type(self, elements: Dict[str, List[Tag]]) -> str:
         """Determine the type of content"""
         # Check for common page types
-        if soup.find('form'):
+        if elements['form']:
             return 'form_page'
-        elif soup.find_all('img'):
+        elif elements['img']:
             return 'image_gallery'
-        elif soup.find('table'):
+        elif elements['table']:
             return 'data_table'
-        elif soup.find_all('article'):
+        elif elements['article']:
             return 'article'
-        elif soup.find('iframe'):
+        elif elements['iframe']:
             return 'embedded_content'
         else:
             return 'general'
     
-    def _detect_language(self, soup: BeautifulSoup) -> str:
+    def _detect_language(self, elements: Dict[str, List[Tag]], text: str) -> str:
         """Detect page language"""
-        html_tag = soup.find('html')
+        html_tag = elements['html'][0] if elements['html'] else None
         if html_tag and html_tag.get('lang'):
             return html_tag.get('lang')
         
         # Fallback to text analysis
-        text = soup.get_text()[:1000]  # First 1000 characters
-        # Simple language detection based on common words
-        english_words = ['the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
-        spanish_words = ['el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'es', 'se', 'no', 'te', 'lo', 'le']
-        
-        text_lower = text.lower()
-        english_count = sum(1 for word in english_words if word in text_lower)
-        spanish_count = sum(1 for word in spanish_words if word in text_lower)
+        # Simple language detection based on common words in the first 1000 characters
+        english_count = spanish_count = 0
+        seen = set()
+        for match in _WORD_RE.finditer(text, 0, 1000):
+            word = match.group().lower()
+            if word in seen:
+                continue
+            if word in _ENGLISH_WORDS:
+                english_count += 1
+            elif word in _SPANISH_WORDS:
+                spanish_count += 1
+            else:
+                continue
+            seen.add(word)
+            
+            # Stop scanning once one language clearly dominates
+            if abs(english_count - spanish_count) >= _LANGUAGE_MARGIN:
+                break
         
         if english_count > spanish_count:
             return 'en'
@@ -372,103 +443,94 @@ class ContentAnalyzer(DataExtractor):
         else:
             return 'unknown'
     
-    def _extract_keywords(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_keywords(self, elements: Dict[str, List[Tag]]) -> List[str]:
         """Extract important keywords from the page"""
         # Get meta keywords
-        meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
+        meta_keywords = _find_meta(elements, 'keywords')
         if meta_keywords and meta_keywords.get('content'):
             return [kw.strip() for kw in meta_keywords['content'].split(',')]
         
         # Extract from headings
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-        keywords = []
-        for heading in headings:
-            text = heading.get_text(strip=True)
-            if text:
-                keywords.extend(text.split())
+        keywords = [
+            word
+            for tag in _HEADING_TAGS
+            for heading in elements[tag]
+            for word in _WORD_RE.findall(heading.get_text(' '))
+        ]
         
         # Return most common words
-        from collections import Counter
         word_count = Counter(keywords)
         return [word for word, count in word_count.most_common(10)]
     
-    def _extract_headings(self, soup: BeautifulSoup) -> Dict[str, List[str]]:
+    def _extract_headings(self, elements: Dict[str, List[Tag]]) -> Dict[str, List[str]]:
         """Extract all headings from the page"""
-        headings = {'h1': [], 'h2': [], 'h3': [], 'h4': [], 'h5': [], 'h6': []}
-        
-        for tag in headings.keys():
-            elements = soup.find_all(tag)
-            headings[tag] = [elem.get_text(strip=True) for elem in elements]
-        
-        return headings
+        return {
+            tag: [elem.get_text(strip=True) for elem in elements[tag]]
+            for tag in _HEADING_TAGS
+        }
     
-    def _analyze_links(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_links(self, elements: Dict[str, List[Tag]], url: str) -> Dict[str, Any]:
         """Analyze links on the page"""
-        links = soup.find_all('a', href=True)
+        links = [link for link in elements['a'] if 'href' in link.attrs]
         
-        analysis = {
-            'total_links': len(links),
-            'internal_links': 0,
-            'external_links': 0,
-            'broken_links': 0,
-            'mailto_links': 0,
-            'tel_links': 0
-        }
-        
-        current_domain = urlparse(self.driver.current_url).netloc
+        current_domain = _netloc(url)
         
+        # Count into locals and read the attrs dict directly; this loop runs per anchor
+        internal = external = mailto = tel = 0
         for link in links:
-            href = link['href']
+            href = link.attrs['href']
             if href.startswith('mailto:'):
-                analysis['mailto_links'] += 1
+                mailto += 1
             elif href.startswith('tel:'):
-                analysis['tel_links'] += 1
+                tel += 1
             elif href.startswith('http'):
-                if urlparse(href).netloc == current_domain:
-                    analysis['internal_links'] += 1
+                if _netloc(href) == current_domain:
+                    internal += 1
                 else:
-                    analysis['external_links'] += 1
+                    external += 1
             elif href.startswith('/'):
-                analysis['internal_links'] += 1
+                internal += 1
         
-        return analysis
+        return {
+            'total_links': len(links),
+            'internal_links': internal,
+            'external_links': external,
+            'broken_links': 0,
+            'mailto_links': mailto,
+            'tel_links': tel
+        }
     
-    def _analyze_images(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_images(self, elements: Dict[str, List[Tag]]) -> Dict[str, Any]:
         """Analyze images on the page"""
-        images = soup.find_all('img')
-        
-        analysis = {
-            'total_images': len(images),
-            'images_with_alt': 0,
-            'images_without_alt': 0,
-            'large_images': 0,
-            'small_images': 0
-        }
+        images = elements['img']
         
+        with_alt = large = small = 0
         for img in images:
-            if img.get('alt'):
-                analysis['images_with_alt'] += 1
-            else:
-                analysis['images_without_alt'] += 1
+            attrs = img.attrs
+            if attrs.get('alt'):
+                with_alt += 1
             
-            # Check image size if available
-            width = img.get('width')
-            height = img.get('height')
-            if width and height:
-                try:
-                    w, h = int(width), int(height)
-                    if w > 500 or h > 500:
-                        analysis['large_images'] += 1
-                    else:
-                        analysis['small_images'] += 1
-                except ValueError:
-                    pass
+            # Check image size if available; isdecimal (unlike isdigit, which
+            # accepts '²') only passes strings int() can parse
+            width = attrs.get('width')
+            height = attrs.get('height')
+            if width and height and width.isdecimal() and height.isdecimal():
+                if int(width) > 500 or int(height) > 500:
+                    large += 1
+                else:
+                    small += 1
         
-        return analysis
+        return {
+            'total_images': len(images),
+            'images_with_alt': with_alt,
+            'images_without_alt': len(images) - with_alt,
+            'large_images': large,
+            'small_images': small
+        }
     
-    def _analyze_forms(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _analyze_forms(self, elements: Dict[str, List[Tag]]) -> Dict[str, Any]:
         """Analyze forms on the page"""
-        forms = soup.find_all('form')
+        forms = elements['form']
         
         analysis = {
             'total_forms': len(forms),
@@ -486,38 +548,37 @@ class ContentAnalyzer(DataExtractor):
                 analysis['search_forms'] += 1
             
             # Check for validation
-            if form.find(['input', 'textarea'], attrs={'required': True}):
+            if _REQUIRED_FIELD_SELECTOR.select_one(form):
                 analysis['forms_with_validation'] += 1
             
             # Check for CAPTCHA
-            if form.find(['iframe', 'div'], attrs={'class': lambda x: x and 'captcha' in x.lower()}):
+            if _CAPTCHA_SELECTOR.select_one(form) is not None:
                 analysis['forms_with_captcha'] += 1
         
         return analysis
     
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_metadata(self, elements: Dict[str, List[Tag]]) -> Dict[str, str]:
         """Extract page metadata"""
         metadata = {}
         
         # Title
-        title = soup.find('title')
-        if title:
-            metadata['title'] = title.get_text(strip=True)
+        if elements['title']:
+            metadata['title'] = elements['title'][0].get_text(strip=True)
         
         # Meta description
-        description = soup.find('meta', attrs={'name': 'description'})
+        description = _find_meta(elements, 'description')
         if description and description.get('content'):
             metadata['description'] = description['content']
         
         # Meta author
-        author = soup.find('meta', attrs={'name': 'author'})
+        author = _find_meta(elements, 'author')
         if author and author.get('content'):
             metadata['author'] = author['content']
         
         # Open Graph tags
-        og_tags = soup.find_all('meta', attrs={'property': lambda x: x and x.startswith('og:')})
+        og_tags = [tag for tag in elements['meta'] if _OG_PREFIX_RE.match(tag.get('property', ''))]
         for tag in og_tags:
-            prop = tag.get('property', '').replace('og:', '')
+            prop = _OG_PREFIX_RE.sub('', tag.get('property', ''))
             content = tag.get('content', '')
             if prop and content:
                 metadata[f'og_{prop}'] = content
@@ -537,7 +598,7 @@ class DataExtractionManager:
             'content': ContentAnalyzer(driver, task)
         }
     
-    def extract_all(self, url: str) -> Dict[str, Any]:
+    def extract_all(self, url: str, page_source: Optional[str] = None) -> Dict[str, Any]:
         """Run all extractors and return combined data"""
         all_data = {
             'url': url,
@@ -545,10 +606,21 @@ class DataExtractionManager:
             'extracted_data': {}
         }
         
+        try:
+            if page_source is None:
+                page_source = self.driver.page_source
+            soup = BeautifulSoup(page_source, _HTML_PARSER)
+        except Exception as e:
+            logger.error(f"Error parsing page source for {url}: {e}")
+            for name in self.extractors:
+                all_data['extracted_data'][name] = {}
+            return all_data
+        
+        # Extractors are CPU-bound soup walks, so a thread pool only adds
+        # GIL contention; run them in turn on the shared tree
         for name, extractor in self.extractors.items():
             try:
-                data = extractor.extract(url)
-                all_data['extracted_data'][name] = data
+                all_data['extracted_data'][name] = extractor.extract(url, soup)
             except Exception as e:
                 logger.error(f"Error in {name} extractor: {e}")
                 all_data['extracted_data'][name] = {}
@@ -1,19 +1,26 @@
 """
 Enhanced Selenium automation service with advanced features
 """
-import io
+import base64
+import gzip
 import time
 import json
 import logging
 import psutil
 import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from urllib.parse import urljoin, urlparse
 
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db import transaction
 from django.utils import timezone
 
 from selenium import webdriver
@@ -29,7 +36,6 @@ from selenium.common.exceptions import (
     WebDriverException, StaleElementReferenceException
 )
 from webdriver_manager.chrome import ChromeDriverManager
-from PIL import Image
 
 from .models import AutomationTask, PageEvent, CaptchaEvent, AutomationLog, AutomationStats
 from .data_extractors import DataExtractionManager
@@ -39,17 +45,53 @@ from .monitoring import alert_manager, performance_monitor, real_time_monitor
 
 logger = logging.getLogger(__name__)
 
+LOG_BATCH_SIZE = 500
+DB_LOG_LEVELS = ('WARNING', 'ERROR', 'CRITICAL')  # lower levels go to the per-task JSONL file
+IO_WORKERS = 4
+ANALYSIS_WORKERS = 2
+STATS_SAMPLE_INTERVAL = 1.0  # seconds between psutil samples
+MONITOR_MIN_INTERVAL = 1.0  # seconds between monitoring callbacks
+MONITOR_MAX_INTERVAL = 10.0
+MONITOR_BACKOFF = 1.5
+SCREENSHOT_JPEG_QUALITY = 70
+HTML_GZIP_LEVEL = 3
+
+# Links that are never worth crawling
+_SKIP_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar')
+_SKIP_PATTERNS = ('#', 'javascript:', 'mailto:', 'tel:')
+
+# Crawls keep seeing the same URLs (nav links, paginated listings)
+_cached_urlparse = lru_cache(maxsize=4096)(urlparse)
+
+# Resolved once per worker process by _get_chromedriver_path
+_CHROMEDRIVER_PATH = None
+
+
+def task_log_path(task_id) -> Path:
+    """Per-task JSONL file that receives a run's INFO/DEBUG lines"""
+    return Path(settings.MEDIA_ROOT) / "logs" / f"task_{task_id}.jsonl"
+
+
+def _get_chromedriver_path() -> str:
+    """Return the chromedriver binary path, installing/resolving it only on first use"""
+    global _CHROMEDRIVER_PATH
+    if _CHROMEDRIVER_PATH is None:
+        _CHROMEDRIVER_PATH = ChromeDriverManager().install()
+    return _CHROMEDRIVER_PATH
+
 
 class EnhancedSeleniumAutomationService:
     """Enhanced Selenium automation service with advanced features"""
     
     def __init__(self, task: AutomationTask):
         self.task = task
+        self.task_id = str(task.id)
         self.driver = None
         self.stats = {
             'start_time': time.time(),
             'pages_visited': 0,
             'errors': 0,
+            'successful_requests': 0,
             'captcha_detections': 0,
             'memory_peak': 0,
             'cpu_peak': 0,
@@ -62,9 +104,51 @@ class EnhancedSeleniumAutomationService:
         self.captcha_detector = None
         self.ai_analyzer = None
         
+        # cpu_percent() measures since the previous call on the same Process
+        self._psutil_proc = psutil.Process()
+        self._last_cpu_sample_ts = 0.0
+        
+        # Monitoring callbacks back off while nothing changes
+        self._monitor_interval = MONITOR_MIN_INTERVAL
+        self._last_monitor_ts = 0.0
+        self._last_monitor_state = None
+        
+        # Raw page source is opt-out via task.config['save_raw_html']
+        self._save_raw_html = (task.config or {}).get('save_raw_html', True)
+        
+        # Screenshots default to CDP JPEG; task.config['screenshot_format'] = 'png' opts back in
+        self._screenshot_format = (task.config or {}).get('screenshot_format', 'jpeg')
+        
+        # Per-page network summary from the Chrome performance log (opt-in)
+        self._collect_perflog = (task.config or {}).get('collect_perflog', False)
+        
+        # Unsaved log rows, written in batches by _flush_logs
+        self._log_buffer: List[AutomationLog] = []
+        self._log_lock = threading.Lock()
+        
+        # INFO/DEBUG lines are appended to media/logs/task_<id>.jsonl instead of the database;
+        # the file is opened by run_enhanced_automation so unused services hold no handle
+        self._jsonl_path = task_log_path(self.task.id)
+        self._jsonl_fh = None
+        
+        # Screenshot/HTML files are written off the driver thread
+        self._io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='automation-io')
+        
+        # Data extraction and AI analysis run side by side on the same page source
+        self._analysis_pool = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='automation-analysis')
+        
     def _log(self, level: str, message: str, **kwargs):
         """Enhanced logging with metadata"""
-        AutomationLog.objects.create(
+        getattr(logger, level.lower(), logger.info)(message)
+        
+        if level not in DB_LOG_LEVELS:
+            line = json.dumps({'ts': time.time(), 'level': level, 'msg': message, **kwargs}, default=str)
+            with self._log_lock:
+                if self._jsonl_fh is not None and not self._jsonl_fh.closed:
+                    self._jsonl_fh.write(line + "\n")
+            return
+        
+        entry = AutomationLog(
             task=self.task,
             level=level,
             message=message,
@@ -73,20 +157,65 @@ class EnhancedSeleniumAutomationService:
             line_number=kwargs.get('line_number', None),
             metadata=kwargs.get('metadata', {})
         )
-        getattr(logger, level.lower(), logger.info)(message)
+        
+        # Analysis workers log too, so guard the shared buffer
+        with self._log_lock:
+            self._log_buffer.append(entry)
+            should_flush = len(self._log_buffer) >= LOG_BATCH_SIZE
+        
+        if should_flush:
+            self._flush_logs()
+    
+    def _flush_logs(self):
+        """Write buffered log rows with a single batched INSERT"""
+        with self._log_lock:
+            if not self._log_buffer:
+                return
+            pending, self._log_buffer = self._log_buffer, []
+        
+        try:
+            AutomationLog.objects.bulk_create(pending, batch_size=LOG_BATCH_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} automation logs: {e}")
     
     def _update_stats(self):
         """Update resource usage statistics"""
+        now = time.monotonic()
+        if now - self._last_cpu_sample_ts < STATS_SAMPLE_INTERVAL:
+            return
+        
         try:
-            process = psutil.Process()
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            cpu_percent = process.cpu_percent()
+            cpu_percent, memory_mb = performance_monitor.sample(self._psutil_proc)
+            self._last_cpu_sample_ts = now
             
             self.stats['memory_peak'] = max(self.stats['memory_peak'], memory_mb)
             self.stats['cpu_peak'] = max(self.stats['cpu_peak'], cpu_percent)
         except Exception as e:
             self._log('WARNING', f"Failed to update stats: {e}")
     
+    def _run_monitoring(self, stats: AutomationStats):
+        """Run monitoring callbacks, backing off while error/CAPTCHA counts stay flat"""
+        now = time.monotonic()
+        if now - self._last_monitor_ts < self._monitor_interval:
+            return
+        self._last_monitor_ts = now
+        
+        state = (self.stats['errors'], self.stats['captcha_detections'])
+        if state != self._last_monitor_state:
+            self._monitor_interval = MONITOR_MIN_INTERVAL
+        else:
+            self._monitor_interval = min(self._monitor_interval * MONITOR_BACKOFF, MONITOR_MAX_INTERVAL)
+        self._last_monitor_state = state
+        
+        # Update monitoring
+        real_time_monitor.update_task_status(self.task)
+        
+        # Check performance
+        performance_alerts = performance_monitor.check_performance(self.task, stats)
+        if performance_alerts:
+            for alert in performance_alerts:
+                alert_manager.send_alert(self.task, alert, 'warning', task_id=self.task_id)
+    
     def _build_driver(self) -> webdriver.Chrome:
         """Build and configure Chrome WebDriver with advanced options"""
         try:
@@ -118,28 +247,35 @@ class EnhancedSeleniumAutomationService:
             else:
                 options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
             
+            # Text/data-only crawls can skip image downloads entirely
+            if not (self.task.config or {}).get('load_images', True):
+                options.add_experimental_option("prefs", {
+                    "profile.managed_default_content_settings.images": 2,
+                    "profile.default_content_setting_values.notifications": 2
+                })
+                options.add_argument("--blink-settings=imagesEnabled=false")
+            
             # Enable performance logging
             options.add_argument("--enable-logging")
             options.add_argument("--log-level=0")
             
-            # Set up capabilities
-            caps = webdriver.DesiredCapabilities.CHROME.copy()
-            caps["goog:loggingPrefs"] = {
-                "performance": "ALL",
-                "browser": "ALL"
-            }
+            # Chrome buffers performance events until they are read, so only
+            # enable them when the run drains them every page
+            logging_prefs = {"browser": "ALL"}
+            if self._collect_perflog:
+                logging_prefs["performance"] = "ALL"
+            options.set_capability("goog:loggingPrefs", logging_prefs)
             
             # Create driver
-            service = Service(ChromeDriverManager().install())
+            service = Service(_get_chromedriver_path())
             driver = webdriver.Chrome(
                 service=service,
-                options=options,
-                desired_capabilities=caps
+                options=options
             )
             
             # Set timeouts
             driver.set_page_load_timeout(self.task.timeout)
-            driver.implicitly_wait(10)
+            # No implicit wait: it makes every empty find_elements() probe block for the full timeout
             
             # Execute script to remove webdriver property
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -151,65 +287,93 @@ class EnhancedSeleniumAutomationService:
             self._log('ERROR', f"Failed to initialize Chrome driver: {e}")
             raise
     
-    def _save_screenshot(self, note: str = "") -> Optional[str]:
-        """Save screenshot with enhanced metadata"""
+    def _save_screenshot(self, note: str = "") -> Optional[Future]:
+        """Capture a screenshot and queue it to be written to disk"""
         try:
             if not self.driver:
                 return None
                 
-            png_data = self.driver.get_screenshot_as_png()
-            img = Image.open(io.BytesIO(png_data))
+            if self._screenshot_format == 'png':
+                image_data = self.driver.get_screenshot_as_png()
+                extension = 'png'
+            else:
+                result = self.driver.execute_cdp_cmd(
+                    'Page.captureScreenshot',
+                    {'format': 'jpeg', 'quality': SCREENSHOT_JPEG_QUALITY}
+                )
+                image_data = base64.b64decode(result['data'])
+                extension = 'jpg'
             
             # Create filename with timestamp
             timestamp = int(time.time() * 1000)
-            filename = f"task_{self.task.id}_{timestamp}.png"
-            
-            # Save to media directory
-            media_path = Path(settings.MEDIA_ROOT) / "screenshots"
-            media_path.mkdir(parents=True, exist_ok=True)
-            file_path = media_path / filename
-            
-            img.save(file_path, 'PNG')
+            filename = f"task_{self.task.id}_{timestamp}.{extension}"
             
-            # Return relative path for database
-            return f"screenshots/{filename}"
+            return self._io_pool.submit(self._write_screenshot, image_data, filename)
             
         except Exception as e:
             self._log('ERROR', f"Failed to save screenshot: {e}")
             return None
     
-    def _save_html(self) -> Optional[str]:
-        """Save HTML content with enhanced processing"""
+    def _write_screenshot(self, image_data: bytes, filename: str) -> str:
+        """Write screenshot bytes to the media directory (runs on the I/O pool)"""
+        # Chrome already returns an encoded image, so write it as-is
+        media_path = Path(settings.MEDIA_ROOT) / "screenshots"
+        media_path.mkdir(parents=True, exist_ok=True)
+        (media_path / filename).write_bytes(image_data)
+        
+        # Return relative path for database
+        return f"screenshots/{filename}"
+    
+    def _save_html(self, html_content: Optional[str] = None) -> Optional[Future]:
+        """Queue page source to be written to disk"""
         try:
-            if not self.driver:
+            if not self.driver or not self._save_raw_html:
                 return None
-                
-            html_content = self.driver.page_source
+            
+            if html_content is None:
+                html_content = self.driver.page_source
             
             # Create filename with timestamp
             timestamp = int(time.time() * 1000)
-            filename = f"task_{self.task.id}_{timestamp}.html"
-            
-            # Save to media directory
-            media_path = Path(settings.MEDIA_ROOT) / "html"
-            media_path.mkdir(parents=True, exist_ok=True)
-            file_path = media_path / filename
+            filename = f"task_{self.task.id}_{timestamp}.html.gz"
             
-            file_path.write_text(html_content, encoding='utf-8')
-            
-            # Return relative path for database
-            return f"html/{filename}"
+            return self._io_pool.submit(self._write_html, html_content, filename)
             
         except Exception as e:
             self._log('ERROR', f"Failed to save HTML: {e}")
             return None
     
+    def _write_html(self, html_content: str, filename: str) -> str:
+        """Write gzipped page source to the media directory (runs on the I/O pool)"""
+        media_path = Path(settings.MEDIA_ROOT) / "html"
+        media_path.mkdir(parents=True, exist_ok=True)
+        with gzip.open(media_path / filename, 'wt', encoding='utf-8', compresslevel=HTML_GZIP_LEVEL) as f:
+            f.write(html_content)
+        
+        # Return relative path for database
+        return f"html/{filename}"
+    
+    def _resolve_saved_path(self, future: Optional[Future], label: str) -> Optional[str]:
+        """Wait for a queued write and return its relative path, or None if it failed"""
+        if future is None:
+            return None
+        
+        try:
+            return future.result()
+        except Exception as e:
+            self._log('ERROR', f"Failed to save {label}: {e}")
+            return None
+    
     def _handle_captcha_detection(self, page_event: PageEvent) -> bool:
         """Enhanced CAPTCHA detection and handling"""
         try:
             if not self.captcha_detector:
                 self.captcha_detector = AdvancedCaptchaDetector(self.driver)
             
+            # Most pages have no CAPTCHA markup at all; skip the full scan for those
+            if not self.captcha_detector.has_captcha_markup():
+                return False
+            
             captcha_info = self.captcha_detector.detect_captcha()
             if not captcha_info or not captcha_info.get('detected'):
                 return False
@@ -241,7 +405,8 @@ class EnhancedSeleniumAutomationService:
             alert_manager.send_alert(
                 self.task,
                 f"CAPTCHA detected: {captcha_info['type']}",
-                'warning'
+                'warning',
+                task_id=self.task_id
             )
             
             return True
@@ -250,14 +415,13 @@ class EnhancedSeleniumAutomationService:
             self._log('ERROR', f"Failed to handle CAPTCHA detection: {e}")
             return False
     
-    def _extract_data(self, url: str) -> Dict[str, Any]:
-        """Extract data using advanced extractors"""
+    def _extract_data(self, url: str, page_source: Optional[str] = None) -> Dict[str, Any]:
+        """Extract data using advanced extractors; runs on the analysis pool, so the caller counts results"""
         try:
             if not self.data_extractor:
                 self.data_extractor = DataExtractionManager(self.driver, self.task)
             
-            extracted_data = self.data_extractor.extract_all(url)
-            self.stats['data_extracted'] += 1
+            extracted_data = self.data_extractor.extract_all(url, page_source)
             
             self._log('INFO', f"Data extraction completed for {url}")
             return extracted_data
@@ -266,14 +430,13 @@ class EnhancedSeleniumAutomationService:
             self._log('ERROR', f"Data extraction failed for {url}: {e}")
             return {}
     
-    def _analyze_content(self, url: str) -> Dict[str, Any]:
-        """Analyze content using AI-powered analyzer"""
+    def _analyze_content(self, url: str, page_source: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze content using AI-powered analyzer; runs on the analysis pool, so the caller counts results"""
         try:
             if not self.ai_analyzer:
                 self.ai_analyzer = AIContentAnalyzer(self.driver, self.task)
             
-            analysis = self.ai_analyzer.analyze_page_intelligence(url)
-            self.stats['ai_analysis_count'] += 1
+            analysis = self.ai_analyzer.analyze_page_intelligence(url, page_source)
             
             self._log('INFO', f"AI content analysis completed for {url}")
             return analysis
@@ -285,8 +448,15 @@ class EnhancedSeleniumAutomationService:
     def _create_enhanced_page_event(self, event_type: str, url: str, **kwargs) -> PageEvent:
         """Create enhanced page event with additional data"""
         try:
-            screenshot_path = self._save_screenshot(kwargs.get('note', ''))
-            html_path = self._save_html()
+            if 'screenshot_future' in kwargs:
+                screenshot_future = kwargs['screenshot_future']
+            else:
+                screenshot_future = self._save_screenshot(kwargs.get('note', ''))
+            
+            if 'html_future' in kwargs:
+                html_future = kwargs['html_future']
+            else:
+                html_future = self._save_html() if self._save_raw_html else None
             
             # Extract additional metadata
             metadata = kwargs.get('metadata', {})
@@ -299,6 +469,12 @@ class EnhancedSeleniumAutomationService:
             if 'ai_analysis' in kwargs:
                 metadata['ai_analysis'] = kwargs['ai_analysis']
             
+            if self._collect_perflog:
+                metadata['perf'] = self._drain_perf_log()
+            
+            screenshot_path = self._resolve_saved_path(screenshot_future, 'screenshot')
+            html_path = self._resolve_saved_path(html_future, 'HTML')
+            
             page_event = PageEvent.objects.create(
                 task=self.task,
                 event_type=event_type,
@@ -318,38 +494,64 @@ class EnhancedSeleniumAutomationService:
             self._log('ERROR', f"Failed to create enhanced page event: {e}")
             return None
     
+    def _drain_perf_log(self) -> List[Dict[str, Any]]:
+        """Read (and thereby clear) the browser performance log, keeping network responses only"""
+        responses = []
+        try:
+            for entry in self.driver.get_log('performance'):
+                try:
+                    message = json.loads(entry['message'])['message']
+                except (KeyError, ValueError):
+                    continue
+                
+                if message.get('method') != 'Network.responseReceived':
+                    continue
+                
+                response = message.get('params', {}).get('response', {})
+                responses.append({
+                    'url': response.get('url'),
+                    'status': response.get('status'),
+                    'mime_type': response.get('mimeType'),
+                    'encoded_bytes': response.get('encodedDataLength')
+                })
+        except Exception as e:
+            self._log('WARNING', f"Failed to read performance log: {e}")
+        
+        return responses
+    
     def _extract_links(self, current_url: str) -> List[str]:
         """Extract links with enhanced filtering"""
         try:
             if not self.driver:
                 return []
             
-            links = []
-            current_domain = urlparse(current_url).netloc
+            links = set()
+            current_domain = _cached_urlparse(current_url).netloc
             
-            # Find all links
-            link_elements = self.driver.find_elements(By.TAG_NAME, "a")
+            # Read every href in one WebDriver round-trip; SVG anchors expose an
+            # SVGAnimatedString (serialized as a dict), so keep plain strings only
+            hrefs = self.driver.execute_script(
+                "return Array.from(document.querySelectorAll('a[href]'), a => a.href)"
+                ".filter(h => typeof h === 'string');"
+            ) or []
             
-            for element in link_elements:
+            for href in hrefs:
+                if not href:
+                    continue
                 try:
-                    href = element.get_attribute("href")
-                    if href:
-                        # Convert relative URLs to absolute
-                        absolute_url = urljoin(current_url, href)
-                        parsed_url = urlparse(absolute_url)
+                    # Convert relative URLs to absolute
+                    absolute_url = urljoin(current_url, href)
+                    parsed_url = _cached_urlparse(absolute_url)
+                    
+                    # Enhanced filtering
+                    if self._should_follow_link(absolute_url, parsed_url, current_domain):
+                        links.add(absolute_url)
                         
-                        # Enhanced filtering
-                        if self._should_follow_link(absolute_url, parsed_url, current_domain):
-                            links.append(absolute_url)
-                            
-                except StaleElementReferenceException:
-                    continue
-                except Exception:
+                except ValueError:
                     continue
             
-            # Remove duplicates and limit
-            unique_links = list(set(links))[:50]
-            return unique_links
+            # Already deduplicated; just limit
+            return list(islice(links, 50))
             
         except Exception as e:
             self._log('ERROR', f"Failed to extract links: {e}")
@@ -361,14 +563,14 @@ class EnhancedSeleniumAutomationService:
         if parsed_url.netloc != current_domain:
             return False
         
+        low = url.lower()
+        
         # Skip certain file types
-        skip_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.zip', '.rar']
-        if any(url.lower().endswith(ext) for ext in skip_extensions):
+        if low.endswith(_SKIP_EXTENSIONS):
             return False
         
         # Skip certain URL patterns
-        skip_patterns = ['#', 'javascript:', 'mailto:', 'tel:']
-        if any(pattern in url.lower() for pattern in skip_patterns):
+        if any(pattern in low for pattern in _SKIP_PATTERNS):
             return False
         
         return True
@@ -376,6 +578,9 @@ class EnhancedSeleniumAutomationService:
     def run_enhanced_automation(self):
         """Main enhanced automation execution method"""
         try:
+            self._jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl_fh = open(self._jsonl_path, 'a', encoding='utf-8', buffering=64 * 1024)
+            
             self._log('INFO', f"Starting enhanced automation for task {self.task.id}")
             
             # Start monitoring
@@ -395,13 +600,20 @@ class EnhancedSeleniumAutomationService:
             self.ai_analyzer = AIContentAnalyzer(self.driver, self.task)
             
             # URLs to visit
-            urls_to_visit = [self.task.start_url]
+            urls_to_visit = deque([self.task.start_url])
+            queued_urls = {self.task.start_url}
             visited_urls = set()
             
+            # Stats row is only written at the end; fetch it once for the performance checks
+            stats, created = AutomationStats.objects.get_or_create(task=self.task)
+            
+            # Earliest time the next request may be sent
+            next_request_ts = 0.0
+            
             while urls_to_visit and self.stats['pages_visited'] < self.task.max_pages:
                 try:
                     # Get next URL
-                    current_url = urls_to_visit.pop(0)
+                    current_url = urls_to_visit.popleft()
                     
                     if current_url in visited_urls:
                         continue
@@ -409,38 +621,65 @@ class EnhancedSeleniumAutomationService:
                     visited_urls.add(current_url)
                     self._log('INFO', f"Visiting: {current_url}")
                     
-                    # Navigate to URL
+                    # Politeness delay, minus the time already spent on the previous page
+                    remaining = next_request_ts - time.monotonic()
+                    if remaining > 0:
+                        time.sleep(remaining)
+                    
+                    # Navigate to URL; failed loads still count against the delay
                     start_time = time.time()
-                    self.driver.get(current_url)
+                    try:
+                        self.driver.get(current_url)
+                    finally:
+                        next_request_ts = time.monotonic() + self.task.delay_between_requests
                     load_time = time.time() - start_time
                     
-                    # Wait for page to load
-                    time.sleep(self.task.delay_between_requests)
-                    
                     # Update stats
                     self.stats['pages_visited'] += 1
                     self._update_stats()
                     
-                    # Extract data
-                    extracted_data = self._extract_data(current_url)
+                    # Read the page once; extraction, analysis and the HTML snapshot share it
+                    page_source = self.driver.page_source
+                    note = f"Page {self.stats['pages_visited']}"
                     
-                    # Analyze content
-                    ai_analysis = self._analyze_content(current_url)
+                    # Capture the screenshot on this thread; the file writes finish on the I/O pool
+                    screenshot_future = self._save_screenshot(note)
+                    html_future = self._save_html(page_source) if self._save_raw_html else None
+                    
+                    # Extract data and analyze content concurrently on the shared page source.
+                    # Both get the URL and page source up front so neither worker touches the
+                    # driver (chromedriver sessions are not thread-safe)
+                    extract_future = self._analysis_pool.submit(self._extract_data, current_url, page_source)
+                    analysis_future = self._analysis_pool.submit(self._analyze_content, current_url, page_source)
+                    
+                    extracted_data = extract_future.result()
+                    ai_analysis = analysis_future.result()
+                    
+                    # Counters are only updated here, on the driver thread
+                    if extracted_data:
+                        self.stats['data_extracted'] += 1
+                    if ai_analysis:
+                        self.stats['ai_analysis_count'] += 1
                     
                     # Create enhanced page event
                     page_event = self._create_enhanced_page_event(
                         event_type='PAGE_LOAD',
                         url=current_url,
                         load_time=load_time,
-                        note=f"Page {self.stats['pages_visited']}",
+                        note=note,
                         extracted_data=extracted_data,
-                        ai_analysis=ai_analysis
+                        ai_analysis=ai_analysis,
+                        screenshot_future=screenshot_future,
+                        html_future=html_future
                     )
                     
                     if not page_event:
                         self.stats['errors'] += 1
                         continue
                     
+                    # Counted directly: errors also include loads that never produced a page
+                    self.stats['successful_requests'] += 1
+                    
                     # Check for CAPTCHA
                     if self._handle_captcha_detection(page_event):
                         self._log('WARNING', "CAPTCHA detected - stopping automation")
@@ -450,21 +689,12 @@ class EnhancedSeleniumAutomationService:
                     if self.stats['pages_visited'] < self.task.max_pages:
                         new_links = self._extract_links(current_url)
                         for link in new_links:
-                            if link not in visited_urls and len(urls_to_visit) < 100:
+                            if link not in visited_urls and link not in queued_urls and len(urls_to_visit) < 100:
                                 urls_to_visit.append(link)
+                                queued_urls.add(link)
                     
-                    # Update monitoring
-                    real_time_monitor.update_task_status(self.task)
-                    
-                    # Check performance
-                    stats, created = AutomationStats.objects.get_or_create(task=self.task)
-                    performance_alerts = performance_monitor.check_performance(self.task, stats)
-                    if performance_alerts:
-                        for alert in performance_alerts:
-                            alert_manager.send_alert(self.task, alert, 'warning')
-                    
-                    # Small delay between requests
-                    time.sleep(self.task.delay_between_requests)
+                    # Monitoring callbacks (throttled)
+                    self._run_monitoring(stats)
                     
                 except TimeoutException:
                     self._log('WARNING', f"Timeout loading {current_url}")
@@ -480,6 +710,9 @@ class EnhancedSeleniumAutomationService:
                     self._log('ERROR', f"Unexpected error on {current_url}: {e}")
                     self.stats['errors'] += 1
                     continue
+                
+                finally:
+                    self._flush_logs()
             
             # Update final task status
             if self.task.status != 'CAPTCHA_DETECTED':
@@ -488,25 +721,32 @@ class EnhancedSeleniumAutomationService:
             
             self.task.total_pages_visited = self.stats['pages_visited']
             self.task.total_errors = self.stats['errors']
-            self.task.save(update_fields=['status', 'finished_at', 'total_pages_visited', 'total_errors'])
+            self.task.total_captcha_detections = self.stats['captcha_detections']
+            self.task.total_successful_requests = self.stats['successful_requests']
             
-            # Update or create stats
-            stats, created = AutomationStats.objects.get_or_create(task=self.task)
+            # Final stats
             stats.total_requests = self.stats['pages_visited']
-            stats.successful_requests = self.stats['pages_visited'] - self.stats['errors']
+            stats.successful_requests = self.stats['successful_requests']
             stats.failed_requests = self.stats['errors']
             stats.captcha_detections = self.stats['captcha_detections']
             stats.memory_peak = self.stats['memory_peak']
             stats.cpu_usage_peak = self.stats['cpu_peak']
             stats.total_screenshots = self.stats['pages_visited']
             stats.total_html_pages = self.stats['pages_visited']
-            stats.save()
+            
+            # Persist the terminal task state and stats as one commit
+            with transaction.atomic():
+                self.task.save(update_fields=[
+                    'status', 'finished_at', 'total_pages_visited', 'total_errors',
+                    'total_captcha_detections', 'total_successful_requests'
+                ])
+                stats.save()
             
             # Check all monitoring rules
             alert_manager.check_all_rules(self.task, stats)
             
             # Stop monitoring
-            real_time_monitor.stop_monitoring(str(self.task.id))
+            real_time_monitor.stop_monitoring(self.task_id)
             
             self._log('INFO', f"Enhanced automation completed. Pages visited: {self.stats['pages_visited']}, Errors: {self.stats['errors']}")
             
@@ -518,7 +758,7 @@ class EnhancedSeleniumAutomationService:
             self.task.save(update_fields=['status', 'error_message', 'finished_at'])
             
             # Stop monitoring
-            real_time_monitor.stop_monitoring(str(self.task.id))
+            real_time_monitor.stop_monitoring(self.task_id)
             
         finally:
             if self.driver:
@@ -527,6 +767,14 @@ class EnhancedSeleniumAutomationService:
                     self._log('INFO', "Enhanced WebDriver closed")
                 except Exception as e:
                     self._log('ERROR', f"Error closing WebDriver: {e}")
+            
+            self._analysis_pool.shutdown(wait=True)
+            self._io_pool.shutdown(wait=True)
+            self._flush_logs()
+            alert_manager.flush_logs()
+            with self._log_lock:
+                if self._jsonl_fh is not None:
+                    self._jsonl_fh.close()
 
 
 def run_enhanced_automation_task(task_id: str):
@@ -1,12 +1,110 @@
 from celery import shared_task
-from .enhanced_selenium_service import run_enhanced_automation_task
+from celery.exceptions import SoftTimeLimitExceeded
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Avg, Count, FloatField, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+from selenium.common.exceptions import WebDriverException
+from .dashboard import refresh_dashboard
+from .enhanced_selenium_service import run_enhanced_automation_task, task_log_path
+from .models import AutomationTask, AutomationStats, PageEvent
 from .monitoring import alert_manager, system_health_monitor
+from .signals import daily_report_cache_key
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# unlink() releases the GIL, so threads overlap the syscalls until the filesystem saturates
+UNLINK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+CLEANUP_BATCH_SIZE = 500
+S3_DELETE_BATCH = 1000  # DeleteObjects limit
+CLEANUP_RATE_LIMIT = '10/s'
+CLEANUP_TIME_LIMIT = 3600
+CLEANUP_SOFT_TIME_LIMIT = 3300
+DAILY_REPORT_CACHE_TIMEOUT = 86400
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+
+def _unlink_quietly(path: str) -> bool:
+    """Remove a file, ignoring ones that are already gone"""
+    try:
+        os.unlink(path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _bulk_unlink(paths: List[str]) -> int:
+    """Remove many files concurrently; returns how many were actually deleted"""
+    if not paths:
+        return 0
+    
+    with ThreadPoolExecutor(max_workers=min(UNLINK_WORKERS, len(paths))) as executor:
+        return sum(executor.map(_unlink_quietly, paths))
+
+
+def _bulk_delete_files(storage, names: List[str]) -> int:
+    """
+    Delete stored files by name using the cheapest path the storage backend offers:
+    concurrent unlinks for local storage, DeleteObjects (1000 keys per call) for
+    boto3-backed storages, and concurrent storage.delete() for anything else
+    """
+    if not names:
+        return 0
+    
+    try:
+        paths = [storage.path(name) for name in names]
+    except NotImplementedError:
+        paths = None
+    if paths is not None:
+        return _bulk_unlink(paths)
+    
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is not None and hasattr(bucket, 'delete_objects'):
+        normalize = getattr(storage, '_normalize_name', lambda name: name)
+        keys = [normalize(name) for name in names]
+        for i in range(0, len(keys), S3_DELETE_BATCH):
+            bucket.delete_objects(Delete={
+                'Objects': [{'Key': key} for key in keys[i:i + S3_DELETE_BATCH]],
+                'Quiet': True
+            })
+        return len(keys)
+    
+    def delete_quietly(name: str) -> bool:
+        try:
+            storage.delete(name)
+            return True
+        except Exception:
+            return False
+    
+    with ThreadPoolExecutor(max_workers=min(UNLINK_WORKERS, len(names))) as executor:
+        return sum(executor.map(delete_quietly, names))
+
+
+# Screenshots and HTML snapshots share one storage backend
+EVENT_FILE_STORAGE = PageEvent._meta.get_field('screenshot').storage
+
+
+# Only transient browser/network failures are worth re-running a whole crawl for
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, WebDriverException)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=TRANSIENT_ERRORS,
+    retry_backoff=True,
+    retry_backoff_max=300,
+    retry_jitter=True,
+    max_retries=3,
+    acks_late=True
+)
 def execute_enhanced_automation_task(self, task_id: str):
     """
     Enhanced Celery task to execute automation with advanced features
@@ -20,161 +118,294 @@ def execute_enhanced_automation_task(self, task_id: str):
         raise
 
 
-@shared_task
+@shared_task(
+    time_limit=CLEANUP_TIME_LIMIT,
+    soft_time_limit=CLEANUP_SOFT_TIME_LIMIT,
+    acks_late=True,
+    reject_on_worker_lost=True
+)
 def cleanup_old_tasks():
     """
-    Enhanced cleanup task with monitoring
-    """
-    from datetime import timedelta
-    from django.utils import timezone
-    from .models import AutomationTask
-    import os
+    Enhanced cleanup task with monitoring.
     
+    Marks expired tasks as TOMBSTONED in one UPDATE, then fans the actual
+    removal out as cleanup_task_batch subtasks on the ``io`` queue. Tombstones
+    left behind by a crashed batch are picked up again on the next run.
+    """
     try:
-        # Delete tasks older than 30 days
-        cutoff_date = timezone.now() - timedelta(days=30)
-        old_tasks = AutomationTask.objects.filter(
+        # Tombstone tasks older than 30 days
+        now = timezone.now()
+        cutoff_date = now - timedelta(days=30)
+        AutomationTask.objects.filter(
             created_at__lt=cutoff_date,
             status__in=['COMPLETED', 'FAILED', 'CANCELLED']
-        )
+        ).update(status='TOMBSTONED', tombstoned_at=now)
         
-        count = 0
-        for task in old_tasks:
-            # Delete associated files
-            for event in task.events.all():
-                if event.screenshot:
-                    try:
-                        os.remove(event.screenshot.path)
-                    except (OSError, ValueError):
-                        pass
-                if event.html_content:
-                    try:
-                        os.remove(event.html_content.path)
-                    except (OSError, ValueError):
-                        pass
-            
-            # Delete task
-            task.delete()
-            count += 1
+        pending = AutomationTask.objects.filter(status='TOMBSTONED').count()
+        batches = -(-pending // CLEANUP_BATCH_SIZE)
+        for _ in range(batches):
+            cleanup_task_batch.delay()
         
-        logger.info(f"Enhanced cleanup completed: {count} old tasks removed")
-        return f"Enhanced cleanup completed: {count} old tasks removed"
+        logger.info(f"Enhanced cleanup scheduled: {pending} old tasks in {batches} batches")
+        return f"Enhanced cleanup scheduled: {pending} old tasks in {batches} batches"
+        
+    except SoftTimeLimitExceeded:
+        # Tombstoning is a single UPDATE, so anything marked is picked up next run
+        logger.warning("Enhanced cleanup hit its time limit; remaining tombstones left for the next run")
+        return "Enhanced cleanup interrupted by time limit"
         
     except Exception as e:
         logger.error(f"Enhanced cleanup failed: {e}")
         raise
 
 
+@shared_task(
+    rate_limit=CLEANUP_RATE_LIMIT,
+    time_limit=CLEANUP_TIME_LIMIT,
+    soft_time_limit=CLEANUP_SOFT_TIME_LIMIT,
+    acks_late=True,
+    reject_on_worker_lost=True
+)
+def cleanup_task_batch():
+    """
+    Claim up to CLEANUP_BATCH_SIZE tombstoned tasks, remove their
+    screenshot/HTML files, then delete the rows
+    """
+    try:
+        with transaction.atomic():
+            # Concurrent batches skip rows another worker has already claimed
+            task_ids = list(
+                AutomationTask.objects.filter(status='TOMBSTONED')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:CLEANUP_BATCH_SIZE]
+            )
+            if not task_ids:
+                return 0
+            
+            claimed = AutomationTask.objects.filter(id__in=task_ids)
+            
+            # Collect every event file up front in one query
+            file_names = [
+                name
+                for names in claimed.values_list('events__screenshot', 'events__html_content')
+                for name in names
+                if name
+            ]
+            
+            # Files first: if we crash here the rows stay tombstoned and are retried
+            removed = _bulk_delete_files(EVENT_FILE_STORAGE, file_names)
+            removed += _bulk_unlink([str(task_log_path(task_id)) for task_id in task_ids])
+            
+            # One cascaded delete instead of a delete per task
+            _, deleted = claimed.delete()
+            count = deleted.get(AutomationTask._meta.label, 0)
+        
+        logger.info(f"Cleanup batch completed: {count} tasks, {removed} files removed")
+        return count
+        
+    except SoftTimeLimitExceeded:
+        # The transaction rolled back, so the claimed rows are still tombstoned and
+        # the next run retries them (already-removed files are skipped)
+        logger.warning("Cleanup batch hit its time limit; claimed tasks left for the next run")
+        return 0
+        
+    except Exception as e:
+        logger.error(f"Cleanup batch failed: {e}")
+        raise
+
+
 @shared_task
 def generate_enhanced_daily_report():
     """
     Generate enhanced daily automation report with AI insights
     """
-    from datetime import timedelta
-    from django.utils import timezone
-    from .models import AutomationTask, AutomationStats
-    from django.contrib.auth.models import User
-    
     try:
-        yesterday = timezone.now() - timedelta(days=1)
-        today = timezone.now()
-        
-        # Get yesterday's tasks
-        tasks = AutomationTask.objects.filter(
-            created_at__gte=yesterday,
-            created_at__lt=today
-        )
-        
-        # Calculate enhanced statistics
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(status='COMPLETED').count()
-        failed_tasks = tasks.filter(status='FAILED').count()
-        captcha_tasks = tasks.filter(status='CAPTCHA_DETECTED').count()
+        # Report on the previous calendar day: [yesterday 00:00, today 00:00)
+        now = timezone.now()
+        yesterday = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        today = yesterday + timedelta(days=1)
         
-        # Get enhanced stats
-        stats = AutomationStats.objects.filter(
-            task__created_at__gte=yesterday,
-            task__created_at__lt=today
+        # The report is serialized once and stored; repeat runs for the same day
+        # reuse it until a task changes. Consumers read it with get_daily_report()
+        cache_key = daily_report_cache_key(yesterday.date())
+        cache.get_or_set(
+            cache_key,
+            lambda: json.dumps(_compute_daily_report(yesterday, today)),
+            DAILY_REPORT_CACHE_TIMEOUT
         )
         
-        total_pages = sum(s.total_requests for s in stats)
-        total_captchas = sum(s.captcha_detections for s in stats)
-        avg_memory = sum(s.memory_peak for s in stats) / len(stats) if stats else 0
-        avg_cpu = sum(s.cpu_usage_peak for s in stats) / len(stats) if stats else 0
-        
-        # AI insights
-        ai_insights = []
-        if completed_tasks > 0:
-            success_rate = (completed_tasks / total_tasks) * 100
-            if success_rate > 90:
-                ai_insights.append("Excellent automation performance - consider scaling up")
-            elif success_rate < 70:
-                ai_insights.append("Performance below optimal - review error patterns")
+        logger.info(f"Enhanced daily report generated: {cache_key}")
+        return cache_key
         
-        if total_captchas > 0:
-            captcha_rate = (total_captchas / total_pages) * 100 if total_pages > 0 else 0
-            if captcha_rate > 10:
-                ai_insights.append("High CAPTCHA detection rate - consider using different strategies")
-        
-        if avg_memory > 500:
-            ai_insights.append("High memory usage detected - consider optimizing tasks")
-        
-        report = {
+    except Exception as e:
+        logger.error(f"Enhanced daily report generation failed: {e}")
+        raise
+
+
+def get_daily_report(day: date) -> Optional[Dict[str, Any]]:
+    """Return the stored daily report for ``day``, or None if it is not cached"""
+    payload = cache.get(daily_report_cache_key(day))
+    return json.loads(payload) if payload is not None else None
+
+
+def _compute_daily_report(yesterday, today) -> Dict[str, Any]:
+    """Build the daily report for tasks created in [yesterday, today)"""
+    # Get yesterday's tasks
+    tasks = AutomationTask.objects.filter(
+        created_at__gte=yesterday,
+        created_at__lt=today
+    )
+    
+    # Quiet day: one existence check instead of the full aggregation
+    if not tasks.exists():
+        return {
             'date': yesterday.date().isoformat(),
             'summary': {
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'failed_tasks': failed_tasks,
-                'captcha_tasks': captcha_tasks,
-                'total_pages_visited': total_pages,
-                'total_captcha_detections': total_captchas,
-                'success_rate': (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+                'total_tasks': 0,
+                'completed_tasks': 0,
+                'failed_tasks': 0,
+                'captcha_tasks': 0,
+                'total_pages_visited': 0,
+                'total_captcha_detections': 0,
+                'success_rate': 0.0
             },
             'performance': {
-                'average_memory_mb': round(avg_memory, 2),
-                'average_cpu_percent': round(avg_cpu, 2),
-                'captcha_detection_rate': round(captcha_rate, 2) if total_pages > 0 else 0
+                'average_memory_mb': 0,
+                'average_cpu_percent': 0,
+                'captcha_detection_rate': 0.0
             },
-            'ai_insights': ai_insights,
-            'recommendations': _generate_recommendations(tasks, stats)
+            'ai_insights': [],
+            'recommendations': []
         }
-        
-        logger.info(f"Enhanced daily report generated: {report}")
-        return report
-        
-    except Exception as e:
-        logger.error(f"Enhanced daily report generation failed: {e}")
-        raise
+    
+    # Calculate enhanced statistics (one GROUP BY status query)
+    by_status = dict(tasks.order_by().values_list('status').annotate(n=Count('id')))
+    total_tasks = sum(by_status.values())
+    completed_tasks = by_status.get('COMPLETED', 0)
+    failed_tasks = by_status.get('FAILED', 0)
+    captcha_tasks = by_status.get('CAPTCHA_DETECTED', 0)
+    
+    # Get enhanced stats
+    stats = AutomationStats.objects.filter(
+        task__created_at__gte=yesterday,
+        task__created_at__lt=today
+    )
+    
+    stats_summary = stats.aggregate(
+        total_pages=Sum('total_requests'),
+        total_captchas=Sum('captcha_detections'),
+        avg_memory=Avg('memory_peak'),
+        avg_cpu=Avg('cpu_usage_peak'),
+        n=Count('id')
+    )
+    total_pages = stats_summary['total_pages'] or 0
+    total_captchas = stats_summary['total_captchas'] or 0
+    avg_memory = stats_summary['avg_memory'] or 0
+    avg_cpu = stats_summary['avg_cpu'] or 0
+    
+    # Rates used by both the insights and the report body
+    success_rate = 100.0 * completed_tasks / total_tasks if total_tasks else 0.0
+    captcha_rate = 100.0 * total_captchas / total_pages if total_pages else 0.0
+    
+    # AI insights
+    ai_insights = []
+    if completed_tasks > 0:
+        if success_rate > 90:
+            ai_insights.append("Excellent automation performance - consider scaling up")
+        elif success_rate < 70:
+            ai_insights.append("Performance below optimal - review error patterns")
+    
+    if total_captchas > 0:
+        if captcha_rate > 10:
+            ai_insights.append("High CAPTCHA detection rate - consider using different strategies")
+    
+    if avg_memory > 500:
+        ai_insights.append("High memory usage detected - consider optimizing tasks")
+    
+    return {
+        'date': yesterday.date().isoformat(),
+        'summary': {
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'failed_tasks': failed_tasks,
+            'captcha_tasks': captcha_tasks,
+            'total_pages_visited': total_pages,
+            'total_captcha_detections': total_captchas,
+            'success_rate': success_rate
+        },
+        'performance': {
+            'average_memory_mb': round(avg_memory, 2),
+            'average_cpu_percent': round(avg_cpu, 2),
+            'captcha_detection_rate': round(captcha_rate, 2)
+        },
+        'ai_insights': ai_insights,
+        'recommendations': _generate_recommendations({
+            **stats_summary,
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks
+        })
+    }
 
 
-def _generate_recommendations(tasks, stats):
-    """Generate AI-powered recommendations"""
+def _generate_recommendations(task_stats: Dict[str, Any]) -> List[str]:
+    """
+    Generate AI-powered recommendations from pre-aggregated report figures
+    (total_tasks, completed_tasks, n, avg_memory, avg_cpu, total_captchas)
+    """
     recommendations = []
     
     # Task completion analysis
-    if tasks.count() > 0:
-        completion_rate = tasks.filter(status='COMPLETED').count() / tasks.count()
+    if task_stats['total_tasks'] > 0:
+        completion_rate = task_stats['completed_tasks'] / task_stats['total_tasks']
         if completion_rate < 0.8:
             recommendations.append("Consider reviewing failed tasks to identify common issues")
     
     # Performance analysis
-    if stats:
-        avg_memory = sum(s.memory_peak for s in stats) / len(stats)
-        if avg_memory > 800:
+    if task_stats['n']:
+        if task_stats['avg_memory'] > 800:
             recommendations.append("High memory usage detected - consider reducing concurrent tasks")
         
-        avg_cpu = sum(s.cpu_usage_peak for s in stats) / len(stats)
-        if avg_cpu > 70:
+        if task_stats['avg_cpu'] > 70:
             recommendations.append("High CPU usage detected - consider optimizing task configurations")
     
     # CAPTCHA analysis
-    total_captchas = sum(s.captcha_detections for s in stats)
+    total_captchas = task_stats['total_captchas'] or 0
     if total_captchas > 5:
         recommendations.append("Frequent CAPTCHA detections - consider implementing CAPTCHA solving strategies")
     
     return recommendations
 
 
+@shared_task
+def precompute_dashboard():
+    """Refresh the shared staff dashboard so requests only read the cache"""
+    refresh_dashboard()
+
+
+@shared_task(
+    autoretry_for=(OSError,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def send_alert_email(alert: Dict[str, Any]):
+    """Email an alert produced by AlertManager.send_alert"""
+    subject = f"Automation Alert: {alert['task_name']}"
+    message = f"""
+Task: {alert['task_name']}
+Type: {alert['alert_type']}
+Message: {alert['message']}
+Time: {alert['timestamp']}
+    """
+    
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [settings.ALERT_EMAIL],
+        fail_silently=False
+    )
+
+
 @shared_task
 def monitor_system_health():
     """
@@ -204,25 +435,22 @@ def process_ai_insights():
     """
     Process AI insights and generate recommendations
     """
-    from .models import AutomationTask, PageEvent
-    from django.utils import timezone
-    from datetime import timedelta
-    
     try:
-        # Get recent tasks
+        # Get recent tasks with their event counts in the same query
         recent_tasks = AutomationTask.objects.filter(
             created_at__gte=timezone.now() - timedelta(days=7)
-        )
+        ).annotate(
+            page_load_count=Count('events', filter=Q(events__event_type='PAGE_LOAD'), distinct=True),
+            captcha_count=Count('captcha_events', distinct=True)
+        ).only('id', 'status')
         
         insights = []
         
         # Analyze task patterns
-        for task in recent_tasks:
+        for task in recent_tasks.iterator(chunk_size=500):
             if task.status == 'COMPLETED':
                 # Analyze page events for patterns
-                events = task.events.filter(event_type='PAGE_LOAD')
-                
-                if events.count() > 10:
+                if task.page_load_count > 10:
                     # High page count - might be inefficient
                     insights.append({
                         'task_id': str(task.id),
@@ -232,8 +460,7 @@ def process_ai_insights():
                     })
                 
                 # Check for CAPTCHA patterns
-                captcha_events = task.captcha_events.all()
-                if captcha_events.count() > 3:
+                if task.captcha_count > 3:
                     insights.append({
                         'task_id': str(task.id),
                         'type': 'captcha',
@@ -254,55 +481,53 @@ def optimize_task_performance():
     """
     Analyze and optimize task performance
     """
-    from .models import AutomationTask, AutomationStats
-    from django.utils import timezone
-    from datetime import timedelta
-    
     try:
-        # Get recent tasks with stats
-        recent_tasks = AutomationTask.objects.filter(
+        # Only completed tasks whose stats breach a threshold; mirrors AutomationStats.success_rate
+        flagged_tasks = AutomationTask.objects.filter(
             created_at__gte=timezone.now() - timedelta(days=7),
-            status='COMPLETED'
-        )
+            status='COMPLETED',
+            stats__isnull=False
+        ).annotate(
+            success_rate=Coalesce(
+                Cast('stats__successful_requests', FloatField()) * 100.0 / NullIf('stats__total_requests', 0),
+                0.0,
+                output_field=FloatField()
+            )
+        ).filter(
+            Q(stats__memory_peak__gt=1000) | Q(stats__cpu_usage_peak__gt=80) | Q(success_rate__lt=70)
+        ).values('id', 'stats__memory_peak', 'stats__cpu_usage_peak', 'success_rate')
         
         optimizations = []
         
-        for task in recent_tasks:
-            try:
-                stats = task.stats
-                if not stats:
-                    continue
-                
-                # Memory optimization
-                if stats.memory_peak > 1000:
-                    optimizations.append({
-                        'task_id': str(task.id),
-                        'optimization': 'memory',
-                        'current_value': stats.memory_peak,
-                        'recommendation': 'Reduce max_pages or enable headless mode'
-                    })
-                
-                # CPU optimization
-                if stats.cpu_usage_peak > 80:
-                    optimizations.append({
-                        'task_id': str(task.id),
-                        'optimization': 'cpu',
-                        'current_value': stats.cpu_usage_peak,
-                        'recommendation': 'Increase delay_between_requests'
-                    })
-                
-                # Success rate optimization
-                if stats.success_rate < 70:
-                    optimizations.append({
-                        'task_id': str(task.id),
-                        'optimization': 'success_rate',
-                        'current_value': stats.success_rate,
-                        'recommendation': 'Review error patterns and improve error handling'
-                    })
-                
-            except Exception as e:
-                logger.error(f"Error analyzing task {task.id}: {e}")
-                continue
+        for row in flagged_tasks.iterator(chunk_size=500):
+            task_id = str(row['id'])
+            
+            # Memory optimization
+            if row['stats__memory_peak'] > 1000:
+                optimizations.append({
+                    'task_id': task_id,
+                    'optimization': 'memory',
+                    'current_value': row['stats__memory_peak'],
+                    'recommendation': 'Reduce max_pages or enable headless mode'
+                })
+            
+            # CPU optimization
+            if row['stats__cpu_usage_peak'] > 80:
+                optimizations.append({
+                    'task_id': task_id,
+                    'optimization': 'cpu',
+                    'current_value': row['stats__cpu_usage_peak'],
+                    'recommendation': 'Increase delay_between_requests'
+                })
+            
+            # Success rate optimization
+            if row['success_rate'] < 70:
+                optimizations.append({
+                    'task_id': task_id,
+                    'optimization': 'success_rate',
+                    'current_value': row['success_rate'],
+                    'recommendation': 'Review error patterns and improve error handling'
+                })
         
         logger.info(f"Performance optimization completed: {len(optimizations)} optimizations suggested")
         return optimizations
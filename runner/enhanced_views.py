@@ -1,13 +1,17 @@
 """
 Enhanced API views with advanced features
 """
+import operator
+from datetime import timedelta
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Sum
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
@@ -20,27 +24,46 @@ from .serializers import (
     TaskCreateSerializer, TaskUpdateSerializer, PageEventSerializer,
     CaptchaEventSerializer, AutomationLogSerializer, AutomationStatsSerializer
 )
+from .pagination import TaskCursorPagination
+from .signals import daily_report_cache_key
+from .dashboard import evaluate_insights, get_dashboard, visible_tasks
 from .enhanced_tasks import execute_enhanced_automation_task
-from .automation_templates import TemplateManager
+from .automation_templates import get_template_manager
 from .monitoring import (
     alert_manager, performance_monitor, system_health_monitor, 
-    real_time_monitor
+    real_time_monitor, latest
 )
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Health checks run every registered probe; share one result briefly
+SYSTEM_HEALTH_CACHE_KEY = 'sys_health'
+SYSTEM_HEALTH_CACHE_TIMEOUT = 15  # seconds
+
+BULK_CREATE_BATCH_SIZE = 500
+
+PERFORMANCE_INSIGHT_RULES = [
+    ('error_rate', operator.gt, 0.3,
+     "High error rate detected - consider reviewing target URLs"),
+    ('memory_peak_mb', operator.gt, 1000,
+     "High memory usage - consider reducing max_pages"),
+    ('captcha_detections', operator.gt, 5,
+     "Frequent CAPTCHA detections - consider different approach"),
+]
+
 
 class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
     """
     Enhanced ViewSet for managing automation tasks with advanced features
     """
     queryset = AutomationTask.objects.all()
-    pagination_class = PageNumberPagination
+    pagination_class = TaskCursorPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'priority', 'created_by', 'assigned_to']
     search_fields = ['name', 'description', 'start_url', 'notes']
-    ordering_fields = ['created_at', 'started_at', 'finished_at', 'priority']
+    # Orderings other than created_at are served page-number style (see TaskCursorPagination)
+    ordering_fields = ['created_at', 'started_at', 'finished_at', 'duration_seconds', 'priority']
     ordering = ['-created_at']
     
     def get_serializer_class(self):
@@ -53,14 +76,11 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
         return AutomationTaskDetailSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
         # Filter by user if not admin
-        if not self.request.user.is_staff:
-            queryset = queryset.filter(
-                Q(created_by=self.request.user) | Q(assigned_to=self.request.user)
-            )
-        
+        queryset = visible_tasks(self.request.user, super().get_queryset())
+        if self.action == 'performance_analysis':
+            # The summary reads the task and its stats; fetch both at once
+            queryset = queryset.select_related('stats')
         return queryset
     
     def perform_create(self, serializer):
@@ -105,7 +125,7 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            template_manager = TemplateManager()
+            template_manager = get_template_manager()
             task = template_manager.create_task_from_template(
                 template_name, 
                 request.user, 
@@ -132,7 +152,7 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         
         try:
-            template_manager = TemplateManager()
+            template_manager = get_template_manager()
             recommendations = template_manager.get_template_recommendations(
                 task.start_url,
                 task.description
@@ -155,21 +175,15 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         
         try:
-            stats, created = AutomationStats.objects.get_or_create(task=task)
+            # Stats rows are created with the task and joined by get_queryset;
+            # report zeros rather than writing from a GET if one is missing
+            stats = getattr(task, 'stats', None) or AutomationStats(task=task)
             performance_data = performance_monitor.get_performance_summary(task, stats)
             
             # Add AI insights
-            ai_insights = []
-            if performance_data.get('error_rate', 0) > 0.3:
-                ai_insights.append("High error rate detected - consider reviewing target URLs")
-            
-            if performance_data.get('memory_peak_mb', 0) > 1000:
-                ai_insights.append("High memory usage - consider reducing max_pages")
-            
-            if performance_data.get('captcha_detections', 0) > 5:
-                ai_insights.append("Frequent CAPTCHA detections - consider different approach")
-            
-            performance_data['ai_insights'] = ai_insights
+            performance_data['ai_insights'] = evaluate_insights(
+                PERFORMANCE_INSIGHT_RULES, performance_data
+            )
             
             return Response(performance_data)
             
@@ -191,10 +205,10 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
                 return Response({
                     'is_monitored': True,
                     'status': task.status,
-                    'start_time': monitoring_data['start_time'].isoformat(),
-                    'last_update': monitoring_data['last_update'].isoformat(),
+                    'start_time': monitoring_data['start_time_iso'],
+                    'last_update': monitoring_data['last_update_iso'],
                     'duration_minutes': (monitoring_data['last_update'] - monitoring_data['start_time']).total_seconds() / 60,
-                    'status_history': monitoring_data['status_history'][-5:]  # Last 5 updates
+                    'status_history': latest(monitoring_data['status_history'], 5)  # Last 5 updates
                 })
             else:
                 return Response({
@@ -212,61 +226,25 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def enhanced_dashboard(self, request):
         """Get enhanced dashboard with AI insights"""
-        queryset = self.get_queryset()
-        
-        # Basic counts
-        total_tasks = queryset.count()
-        active_tasks = queryset.filter(status__in=['PENDING', 'RUNNING']).count()
-        completed_tasks = queryset.filter(status='COMPLETED').count()
-        failed_tasks = queryset.filter(status='FAILED').count()
-        captcha_tasks = queryset.filter(status='CAPTCHA_DETECTED').count()
-        
-        # Recent activity
-        recent_tasks = queryset.order_by('-created_at')[:10]
-        recent_serializer = AutomationTaskListSerializer(recent_tasks, many=True)
-        
-        # Performance metrics
-        stats = AutomationStats.objects.filter(task__in=queryset)
-        total_pages = sum(s.total_requests for s in stats)
-        total_captchas = sum(s.captcha_detections for s in stats)
-        avg_success_rate = stats.aggregate(avg=Avg('successful_requests'))['avg'] or 0
-        
-        # AI insights
-        ai_insights = []
-        if avg_success_rate < 70:
-            ai_insights.append("Low success rate detected - consider reviewing task configurations")
-        
-        if total_captchas > 10:
-            ai_insights.append("High CAPTCHA detection rate - consider implementing solving strategies")
-        
-        if active_tasks > 5:
-            ai_insights.append("High number of active tasks - monitor system resources")
+        # Database-derived sections are precomputed by the
+        # precompute_dashboard beat task or cached on first request
+        dashboard_data = dict(get_dashboard(request.user))
         
         # System health
         try:
-            system_health = system_health_monitor.run_health_checks()
+            system_health = cache.get_or_set(
+                SYSTEM_HEALTH_CACHE_KEY,
+                system_health_monitor.run_health_checks,
+                timeout=SYSTEM_HEALTH_CACHE_TIMEOUT
+            )
         except Exception:
             system_health = {'overall_status': 'unknown'}
         
         # Real-time monitoring
         real_time_data = real_time_monitor.get_all_monitoring_data()
         
-        dashboard_data = {
-            'summary': {
-                'total_tasks': total_tasks,
-                'active_tasks': active_tasks,
-                'completed_tasks': completed_tasks,
-                'failed_tasks': failed_tasks,
-                'captcha_tasks': captcha_tasks,
-                'total_pages_visited': total_pages,
-                'total_captcha_detections': total_captchas,
-                'average_success_rate': round(avg_success_rate, 2)
-            },
-            'ai_insights': ai_insights,
-            'system_health': system_health,
-            'real_time_monitoring': real_time_data,
-            'recent_tasks': recent_serializer.data
-        }
+        dashboard_data['system_health'] = system_health
+        dashboard_data['real_time_monitoring'] = real_time_data
         
         return Response(dashboard_data)
     
@@ -274,7 +252,7 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
     def available_templates(self, request):
         """Get all available automation templates"""
         try:
-            template_manager = TemplateManager()
+            template_manager = get_template_manager()
             templates = template_manager.list_templates()
             
             return Response({
@@ -301,16 +279,24 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
             )
         
         try:
-            template_manager = TemplateManager()
-            created_tasks = []
-            
-            for config in configurations:
-                task = template_manager.create_task_from_template(
-                    template_name,
-                    request.user,
-                    **config
+            template_manager = get_template_manager()
+            built_tasks = [
+                template_manager.build_task(template_name, request.user, **config)
+                for config in configurations
+            ]
+            
+            with transaction.atomic():
+                created_tasks = AutomationTask.objects.bulk_create(
+                    built_tasks, batch_size=BULK_CREATE_BATCH_SIZE
                 )
-                created_tasks.append(task)
+                AutomationStats.objects.bulk_create(
+                    [AutomationStats(task=task) for task in created_tasks],
+                    batch_size=BULK_CREATE_BATCH_SIZE
+                )
+            
+            # bulk_create skips post_save, so invalidate the daily reports here
+            for day in {task.created_at.date() for task in created_tasks}:
+                cache.delete(daily_report_cache_key(day))
             
             serializer = AutomationTaskListSerializer(created_tasks, many=True)
             return Response({
@@ -318,6 +304,11 @@ class EnhancedAutomationTaskViewSet(viewsets.ModelViewSet):
                 'count': len(created_tasks)
             }, status=status.HTTP_201_CREATED)
             
+        except ValueError as e:
+            return Response(
+                {'detail': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {'detail': f'Failed to create bulk tasks: {str(e)}'},
@@ -363,15 +354,24 @@ class SystemMonitoringViewSet(viewsets.ViewSet):
                 created_at__gte=timezone.now() - timedelta(days=7)
             )
             
-            stats = AutomationStats.objects.filter(task__in=recent_tasks)
+            task_counts = recent_tasks.aggregate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED'))
+            )
+            stats = AutomationStats.objects.filter(task__in=recent_tasks).aggregate(
+                avg_success=Avg('successful_requests'),
+                total_captchas=Sum('captcha_detections'),
+                avg_memory=Avg('memory_peak'),
+                avg_cpu=Avg('cpu_usage_peak')
+            )
             
             performance_data = {
-                'total_tasks_week': recent_tasks.count(),
-                'completed_tasks_week': recent_tasks.filter(status='COMPLETED').count(),
-                'average_success_rate': stats.aggregate(avg=Avg('successful_requests'))['avg'] or 0,
-                'total_captcha_detections': sum(s.captcha_detections for s in stats),
-                'average_memory_usage': stats.aggregate(avg=Avg('memory_peak'))['avg'] or 0,
-                'average_cpu_usage': stats.aggregate(avg=Avg('cpu_usage_peak'))['avg'] or 0,
+                'total_tasks_week': task_counts['total'],
+                'completed_tasks_week': task_counts['completed'],
+                'average_success_rate': stats['avg_success'] or 0,
+                'total_captcha_detections': stats['total_captchas'] or 0,
+                'average_memory_usage': stats['avg_memory'] or 0,
+                'average_cpu_usage': stats['avg_cpu'] or 0,
                 'active_monitors': real_time_monitor.get_all_monitoring_data()['active_tasks']
             }
             
@@ -413,15 +413,15 @@ class SystemMonitoringViewSet(viewsets.ViewSet):
         try:
             # Get recent alerts from logs
             recent_alerts = AutomationLog.objects.filter(
-                message__startswith='ALERT:',
+                category='ALERT',
                 timestamp__gte=timezone.now() - timedelta(days=7)
             ).order_by('-timestamp')[:50]
             
             alerts = []
             for alert in recent_alerts:
                 alerts.append({
-                    'task_id': alert.task.id if alert.task else None,
-                    'message': alert.message.replace('ALERT: ', ''),
+                    'task_id': alert.task_id,
+                    'message': alert.message,
                     'level': alert.level,
                     'timestamp': alert.timestamp.isoformat(),
                     'metadata': alert.metadata
@@ -451,22 +451,24 @@ class DataAnalysisViewSet(viewsets.ViewSet):
         try:
             from .models import PageEvent
             
-            # Get recent page events with AI analysis
+            # Get recent page events with AI analysis; pull only the
+            # ai_analysis subtree rather than the whole metadata blob
             recent_events = PageEvent.objects.filter(
                 task__created_by=request.user,
                 metadata__ai_analysis__isnull=False
-            ).order_by('-timestamp')[:100]
+            ).order_by('-timestamp').values_list(
+                'url', 'metadata__ai_analysis', 'timestamp'
+            )[:100]
             
             analysis_insights = []
-            for event in recent_events:
-                ai_analysis = event.metadata.get('ai_analysis', {})
+            for url, ai_analysis, timestamp in recent_events.iterator(chunk_size=50):
                 if ai_analysis:
                     analysis_insights.append({
-                        'url': event.url,
+                        'url': url,
                         'page_type': ai_analysis.get('page_type', {}),
                         'content_quality': ai_analysis.get('content_quality', {}),
                         'seo_indicators': ai_analysis.get('seo_indicators', {}),
-                        'timestamp': event.timestamp.isoformat()
+                        'timestamp': timestamp.isoformat()
                     })
             
             return Response({
@@ -487,26 +489,22 @@ class DataAnalysisViewSet(viewsets.ViewSet):
             from .models import PageEvent
             
             # Get recent page events with extracted data
-            recent_events = PageEvent.objects.filter(
+            recent_ids = PageEvent.objects.filter(
                 task__created_by=request.user,
                 metadata__extracted_data__isnull=False
-            ).order_by('-timestamp')[:100]
-            
-            extraction_summary = {
-                'total_events': recent_events.count(),
-                'contact_extractions': 0,
-                'product_extractions': 0,
-                'content_analyses': 0
-            }
-            
-            for event in recent_events:
-                extracted_data = event.metadata.get('extracted_data', {})
-                if extracted_data.get('contact'):
-                    extraction_summary['contact_extractions'] += 1
-                if extracted_data.get('product'):
-                    extraction_summary['product_extractions'] += 1
-                if extracted_data.get('content'):
-                    extraction_summary['content_analyses'] += 1
+            ).order_by('-timestamp').values('id')[:100]
+            
+            def extracted(category):
+                # Extractors store {} on failure, so require a non-empty value
+                key = f'metadata__extracted_data__{category}'
+                return Q(**{f'{key}__isnull': False}) & ~Q(**{key: {}})
+            
+            extraction_summary = PageEvent.objects.filter(id__in=recent_ids).aggregate(
+                total_events=Count('id'),
+                contact_extractions=Count('id', filter=extracted('contact')),
+                product_extractions=Count('id', filter=extracted('product')),
+                content_analyses=Count('id', filter=extracted('content'))
+            )
             
             return Response(extraction_summary)
             
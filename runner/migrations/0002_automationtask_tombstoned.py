@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationtask',
+            name='tombstoned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='automationtask',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('CAPTCHA_DETECTED', 'Captcha Detected'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('CANCELLED', 'Cancelled'), ('PAUSED', 'Paused'), ('TOMBSTONED', 'Tombstoned')], default='PENDING', max_length=32),
+        ),
+    ]
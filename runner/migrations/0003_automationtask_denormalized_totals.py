@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-16 11:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_totals(apps, schema_editor):
+    AutomationTask = apps.get_model('runner', 'AutomationTask')
+    AutomationStats = apps.get_model('runner', 'AutomationStats')
+    stats = AutomationStats.objects.filter(task=OuterRef('pk'))
+    AutomationTask.objects.filter(stats__isnull=False).update(
+        total_captcha_detections=Subquery(stats.values('captcha_detections')[:1]),
+        total_successful_requests=Subquery(stats.values('successful_requests')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0002_automationtask_tombstoned'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationtask',
+            name='total_captcha_detections',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='automationtask',
+            name='total_successful_requests',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-16 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0003_automationtask_denormalized_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='automationtask',
+            index=models.Index(fields=['created_by', 'status'], name='runner_auto_created_3a08a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationtask',
+            index=models.Index(fields=['assigned_to', 'status'], name='runner_auto_assigne_a5fb91_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationtask',
+            index=models.Index(fields=['status', '-created_at'], name='runner_auto_status_fa3a0f_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-16 12:30
+
+from django.db import migrations
+
+# JSONB indexes for the metadata probes in DataAnalysisViewSet. Django
+# compiles ``metadata__<key>__isnull=False`` to the jsonb ``?`` operator,
+# which GIN supports; other backends have no equivalent and skip these.
+POSTGRES_INDEXES = [
+    (
+        'pageevent_meta_gin',
+        'CREATE INDEX IF NOT EXISTS pageevent_meta_gin '
+        'ON runner_pageevent USING GIN (metadata)',
+    ),
+    (
+        'pe_extracted_data_gin',
+        'CREATE INDEX IF NOT EXISTS pe_extracted_data_gin '
+        "ON runner_pageevent USING GIN ((metadata -> 'extracted_data'))",
+    ),
+    (
+        'pe_ai_analysis_ts',
+        'CREATE INDEX IF NOT EXISTS pe_ai_analysis_ts '
+        'ON runner_pageevent (timestamp DESC) '
+        "WHERE metadata ? 'ai_analysis'",
+    ),
+    (
+        'pe_extracted_data_ts',
+        'CREATE INDEX IF NOT EXISTS pe_extracted_data_ts '
+        'ON runner_pageevent (timestamp DESC) '
+        "WHERE metadata ? 'extracted_data'",
+    ),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, sql in POSTGRES_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0004_automationtask_status_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-16 12:55
+
+from django.db import migrations, models
+from django.db.models.functions import Substr
+
+ALERT_PREFIX = 'ALERT: '
+
+
+def backfill_alert_category(apps, schema_editor):
+    AutomationLog = apps.get_model('runner', 'AutomationLog')
+    AutomationLog.objects.filter(message__startswith=ALERT_PREFIX).update(
+        category='ALERT',
+        message=Substr('message', len(ALERT_PREFIX) + 1),
+    )
+
+
+def restore_alert_prefix(apps, schema_editor):
+    AutomationLog = apps.get_model('runner', 'AutomationLog')
+    for log in AutomationLog.objects.filter(category='ALERT').only('message').iterator():
+        log.message = f'{ALERT_PREFIX}{log.message}'
+        log.save(update_fields=['message'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0005_pageevent_metadata_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationlog',
+            name='category',
+            field=models.CharField(blank=True, choices=[('', 'General'), ('ALERT', 'Alert')], default='', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['category', '-timestamp'], name='runner_auto_categor_02de97_idx'),
+        ),
+        migrations.RunPython(backfill_alert_category, restore_alert_prefix),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-16 13:20
+
+from django.db import migrations
+
+
+def create_missing_stats(apps, schema_editor):
+    AutomationTask = apps.get_model('runner', 'AutomationTask')
+    AutomationStats = apps.get_model('runner', 'AutomationStats')
+    missing = AutomationTask.objects.filter(stats__isnull=True).values_list('pk', flat=True)
+    AutomationStats.objects.bulk_create(
+        [AutomationStats(task_id=pk) for pk in missing.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0006_automationlog_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-16 13:45
+
+from django.db import migrations, models
+
+
+def backfill_duration(apps, schema_editor):
+    AutomationTask = apps.get_model('runner', 'AutomationTask')
+    finished = AutomationTask.objects.filter(
+        started_at__isnull=False, finished_at__isnull=False
+    ).only('pk', 'started_at', 'finished_at')
+
+    batch = []
+    for task in finished.iterator(chunk_size=500):
+        task.duration_seconds = (task.finished_at - task.started_at).total_seconds()
+        batch.append(task)
+        if len(batch) >= 500:
+            AutomationTask.objects.bulk_update(batch, ['duration_seconds'])
+            batch = []
+    if batch:
+        AutomationTask.objects.bulk_update(batch, ['duration_seconds'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('runner', '0007_backfill_automationstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationtask',
+            name='duration_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_duration, migrations.RunPython.noop),
+    ]
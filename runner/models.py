@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from datetime import timedelta
 import uuid
 
 
@@ -15,6 +16,7 @@ class AutomationTask(models.Model):
         ('FAILED', 'Failed'),
         ('CANCELLED', 'Cancelled'),
         ('PAUSED', 'Paused'),
+        ('TOMBSTONED', 'Tombstoned'),
     ]
     
     PRIORITY_CHOICES = [
@@ -52,10 +54,15 @@ class AutomationTask(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
+    duration_seconds = models.FloatField(null=True, blank=True)  # set from started/finished_at on save
+    tombstoned_at = models.DateTimeField(null=True, blank=True)  # marked for cleanup
     
     # Results and metadata
     total_pages_visited = models.PositiveIntegerField(default=0)
     total_errors = models.PositiveIntegerField(default=0)
+    # Mirrors of AutomationStats totals so dashboards can sum task rows
+    total_captcha_detections = models.PositiveIntegerField(default=0)
+    total_successful_requests = models.PositiveIntegerField(default=0)
     notes = models.TextField(blank=True, default='')
     error_message = models.TextField(blank=True, default='')
     
@@ -68,13 +75,33 @@ class AutomationTask(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['priority']),
+            # Per-user status filters used by the dashboard counts
+            models.Index(fields=['created_by', 'status']),
+            models.Index(fields=['assigned_to', 'status']),
+            models.Index(fields=['status', '-created_at']),
         ]
     
     def __str__(self):
         return f"Task {self.id} - {self.name or self.start_url} ({self.status})"
     
+    def save(self, *args, **kwargs):
+        # Store the run duration once so listings read a column instead
+        # of subtracting timestamps per row
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'started_at', 'finished_at'} & set(update_fields):
+            if self.started_at and self.finished_at:
+                self.duration_seconds = (self.finished_at - self.started_at).total_seconds()
+            else:
+                self.duration_seconds = None
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'duration_seconds'}
+        
+        super().save(*args, **kwargs)
+    
     @property
     def duration(self):
+        if self.duration_seconds is not None:
+            return timedelta(seconds=self.duration_seconds)
         if self.started_at and self.finished_at:
             return self.finished_at - self.started_at
         return None
@@ -181,8 +208,14 @@ class AutomationLog(models.Model):
         ('CRITICAL', 'Critical'),
     ]
     
+    LOG_CATEGORIES = [
+        ('', 'General'),
+        ('ALERT', 'Alert'),
+    ]
+    
     task = models.ForeignKey(AutomationTask, on_delete=models.CASCADE, related_name='logs')
     level = models.CharField(max_length=10, choices=LOG_LEVELS, default='INFO')
+    category = models.CharField(max_length=20, choices=LOG_CATEGORIES, blank=True, default='')
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     
@@ -199,6 +232,7 @@ class AutomationLog(models.Model):
         indexes = [
             models.Index(fields=['task', 'timestamp']),
             models.Index(fields=['level']),
+            models.Index(fields=['category', '-timestamp']),
         ]
     
     def __str__(self):
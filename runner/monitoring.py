@@ -1,39 +1,107 @@
 """
 Advanced monitoring and alerting system for automation tasks
 """
+import atexit
 import logging
+import psutil
+import threading
 import time
 import json
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Callable
+from itertools import chain, islice
+from typing import Dict, List, Any, Optional, Callable, Set, Tuple
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+from django.dispatch import receiver
+from django.core.signals import setting_changed
 from .models import AutomationTask, AutomationLog, AutomationStats
 
 logger = logging.getLogger(__name__)
 
+# Alert log rows are buffered and written together; callers flush at the end
+# of a unit of work, the timer only covers long-lived processes in between
+ALERT_LOG_BATCH_SIZE = 100
+ALERT_LOG_FLUSH_INTERVAL = 1.0  # seconds
+
+# get_system_metrics results are reused for this long
+SYSTEM_METRICS_TTL = 5.0  # seconds
+
+# Alert suppression: one alert per (rule, task) per window, and at most
+# ALERT_RATE_LIMIT alerts per rule per minute
+ALERT_DEDUP_WINDOW = 600.0  # seconds
+ALERT_DEDUP_MAX_KEYS = 10000
+ALERT_RATE_LIMIT = 30
+
+# In-memory history bounds
+ALERT_HISTORY_SIZE = 1000
+STATUS_HISTORY_SIZE = 10
+
+# Prime psutil's CPU counters so later interval=None calls return the
+# usage since the previous call instead of blocking to sample
+psutil.cpu_percent(interval=None)
+
+# Read once; send_alert checks it on every alert
+_ALERT_EMAIL = getattr(settings, 'ALERT_EMAIL', None)
+
+
+@receiver(setting_changed)
+def _reload_alert_settings(setting, value, **kwargs):
+    global _ALERT_EMAIL
+    if setting == 'ALERT_EMAIL':
+        _ALERT_EMAIL = value
+
+
+def latest(history: deque, n: int) -> list:
+    """Last ``n`` items of a deque as a list (deques don't support slicing)"""
+    return list(islice(history, max(0, len(history) - n), None))
+
+
+@dataclass(slots=True)
+class EvalCtx:
+    """Values shared by every rule evaluated for one task"""
+    now: datetime
+    duration_s: Optional[float]
+    error_rate: Optional[float]
+    
+    @classmethod
+    def for_task(cls, task: AutomationTask, stats: AutomationStats = None) -> 'EvalCtx':
+        now = timezone.now()
+        duration_s = (now - task.started_at).total_seconds() if task.started_at else None
+        error_rate = (
+            stats.failed_requests / stats.total_requests
+            if stats and stats.total_requests else None
+        )
+        return cls(now=now, duration_s=duration_s, error_rate=error_rate)
+
 
 class MonitoringRule:
     """Base class for monitoring rules"""
     
-    def __init__(self, name: str, condition: Callable, action: Callable, enabled: bool = True):
+    def __init__(self, name: str, condition: Callable, action: Callable, enabled: bool = True,
+                 trigger_on: Optional[Set[str]] = None):
         self.name = name
         self.condition = condition
         self.action = action
         self.enabled = enabled
-        self.last_triggered = None
+        # Task statuses this rule can fire for; None means any status
+        self.trigger_on = frozenset(trigger_on) if trigger_on else None
     
-    def check(self, task: AutomationTask, stats: AutomationStats = None) -> bool:
-        """Check if rule condition is met"""
+    def check(self, task: AutomationTask, stats: AutomationStats = None, ctx: EvalCtx = None,
+              allow: Callable[['MonitoringRule', AutomationTask], bool] = None) -> bool:
+        """Run the action if the condition is met and ``allow`` permits it"""
         if not self.enabled:
             return False
         
+        if ctx is None:
+            ctx = EvalCtx.for_task(task, stats)
+        
         try:
-            result = self.condition(task, stats)
-            if result and self.last_triggered != task.id:
-                self.last_triggered = task.id
-                self.action(task, stats)
+            if self.condition(task, stats, ctx) and (allow is None or allow(self, task)):
+                self.action(task, stats, ctx)
                 return True
         except Exception as e:
             logger.error(f"Error in monitoring rule '{self.name}': {e}")
@@ -46,23 +114,67 @@ class AlertManager:
     
     def __init__(self):
         self.rules = []
-        self.alert_history = []
+        self._rules_by_status: Dict[str, List[MonitoringRule]] = {}
+        self._wildcard_rules: List[MonitoringRule] = []
+        self.alert_history = deque(maxlen=ALERT_HISTORY_SIZE)
+        self._last_fired: OrderedDict = OrderedDict()  # (rule, task_id) -> monotonic ts
+        self._recent_fires: Dict[str, deque] = {}  # rule -> monotonic ts in last minute
+        self._fire_lock = threading.Lock()
+        self._pending_logs: List[AutomationLog] = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush_logs)
     
     def add_rule(self, rule: MonitoringRule):
         """Add a monitoring rule"""
         self.rules.append(rule)
+        if rule.trigger_on is None:
+            self._wildcard_rules.append(rule)
+        else:
+            for task_status in rule.trigger_on:
+                self._rules_by_status.setdefault(task_status, []).append(rule)
         logger.info(f"Added monitoring rule: {rule.name}")
     
     def check_all_rules(self, task: AutomationTask, stats: AutomationStats = None):
-        """Check all monitoring rules for a task"""
-        for rule in self.rules:
-            rule.check(task, stats)
-    
-    def send_alert(self, task: AutomationTask, message: str, alert_type: str = 'info'):
-        """Send an alert"""
+        """Check the monitoring rules that apply to the task's status"""
+        ctx = EvalCtx.for_task(task, stats)
+        for rule in chain(self._rules_by_status.get(task.status, ()), self._wildcard_rules):
+            rule.check(task, stats, ctx, allow=self._allow_fire)
+        
+        # Timer threads and atexit are unreliable in Celery prefork children
+        self.flush_logs()
+    
+    def _allow_fire(self, rule: MonitoringRule, task: AutomationTask) -> bool:
+        """Suppress duplicates within the dedup window and enforce the rate limit"""
+        now = time.monotonic()
+        key = (rule.name, task.id)
+        with self._fire_lock:
+            last = self._last_fired.get(key)
+            if last is not None and now - last < ALERT_DEDUP_WINDOW:
+                return False
+            
+            recent = self._recent_fires.setdefault(rule.name, deque())
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if len(recent) >= ALERT_RATE_LIMIT:
+                logger.warning(f"Rate limit reached for monitoring rule '{rule.name}'")
+                return False
+            
+            recent.append(now)
+            self._last_fired[key] = now
+            self._last_fired.move_to_end(key)
+            if len(self._last_fired) > ALERT_DEDUP_MAX_KEYS:
+                self._last_fired.popitem(last=False)
+        return True
+    
+    def send_alert(self, task: Optional[AutomationTask], message: str, alert_type: str = 'info',
+                   task_id: Optional[str] = None):
+        """Send an alert; callers that already hold ``str(task.id)`` can pass it as ``task_id``"""
+        if task_id is None and task is not None:
+            task_id = str(task.id)
         alert = {
-            'task_id': str(task.id),
-            'task_name': task.name,
+            'task_id': task_id,
+            'task_name': task.name if task else 'System',
             'message': message,
             'alert_type': alert_type,
             'timestamp': timezone.now().isoformat()
@@ -70,47 +182,76 @@ class AlertManager:
         
         self.alert_history.append(alert)
         
-        # Log the alert
-        AutomationLog.objects.create(
-            task=task,
-            level='WARNING' if alert_type in ['error', 'critical'] else 'INFO',
-            message=f"ALERT: {message}",
-            metadata={'alert_type': alert_type}
-        )
+        # Log the alert; system-wide alerts have no task row to attach to
+        if task is not None:
+            self._queue_log(AutomationLog(
+                task=task,
+                level='WARNING' if alert_type in ['error', 'critical'] else 'INFO',
+                category='ALERT',
+                message=message,
+                metadata={'alert_type': alert_type}
+            ))
         
         # Send email if configured
-        if hasattr(settings, 'ALERT_EMAIL') and settings.ALERT_EMAIL:
+        if _ALERT_EMAIL:
             self._send_email_alert(alert)
         
-        logger.warning(f"Alert for task {task.id}: {message}")
+        logger.warning(f"Alert for task {alert['task_id']}: {message}")
+    
+    def get_alert_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent alerts, oldest first"""
+        if limit is None:
+            return list(self.alert_history)
+        return latest(self.alert_history, limit)
+    
+    def _queue_log(self, entry: AutomationLog):
+        """Buffer an alert log row, flushing on size or after a short delay"""
+        with self._pending_lock:
+            self._pending_logs.append(entry)
+            flush_now = len(self._pending_logs) >= ALERT_LOG_BATCH_SIZE
+            if not flush_now and self._flush_timer is None:
+                self._flush_timer = threading.Timer(ALERT_LOG_FLUSH_INTERVAL, self._flush_from_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if flush_now:
+            self.flush_logs()
+    
+    def _flush_from_timer(self):
+        try:
+            self.flush_logs()
+        finally:
+            # Timer threads get their own DB connection; don't leak it
+            connection.close()
+    
+    def flush_logs(self):
+        """Write buffered alert log rows with a single batched INSERT"""
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_logs:
+                return
+            pending, self._pending_logs = self._pending_logs, []
+        
+        try:
+            AutomationLog.objects.bulk_create(pending, batch_size=ALERT_LOG_BATCH_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to write {len(pending)} alert logs: {e}")
     
     def _send_email_alert(self, alert: Dict[str, Any]):
-        """Send email alert"""
+        """Queue the alert email on a worker instead of blocking on SMTP"""
         try:
-            subject = f"Automation Alert: {alert['task_name']}"
-            message = f"""
-Task: {alert['task_name']}
-Type: {alert['alert_type']}
-Message: {alert['message']}
-Time: {alert['timestamp']}
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.ALERT_EMAIL],
-                fail_silently=True
-            )
+            from .enhanced_tasks import send_alert_email
+            send_alert_email.delay(alert)
         except Exception as e:
-            logger.error(f"Failed to send email alert: {e}")
+            logger.error(f"Failed to queue email alert: {e}")
 
 
 class PerformanceMonitor:
     """Monitor task performance and resource usage"""
     
     def __init__(self):
-        self.performance_history = []
         self.thresholds = {
             'max_memory_mb': 1000,
             'max_cpu_percent': 80,
@@ -118,8 +259,24 @@ class PerformanceMonitor:
             'max_error_rate': 0.3
         }
     
+    @staticmethod
+    def sample(proc: psutil.Process) -> Tuple[float, float]:
+        """
+        Sample (cpu_percent, rss_mb) for a process in one oneshot() window.
+        
+        Keep ``proc`` for the life of the run: cpu_percent() reports usage
+        since the previous call on the same Process object.
+        """
+        with proc.oneshot():
+            return proc.cpu_percent(), proc.memory_info().rss / 1024 / 1024
+    
     def check_performance(self, task: AutomationTask, stats: AutomationStats = None):
-        """Check task performance against thresholds"""
+        """
+        Check task performance against thresholds.
+        
+        Callers checking many tasks should load them with
+        select_related('stats') and pass ``task.stats``.
+        """
         if not stats:
             return
         
@@ -148,7 +305,7 @@ class PerformanceMonitor:
         return alerts
     
     def get_performance_summary(self, task: AutomationTask, stats: AutomationStats = None) -> Dict[str, Any]:
-        """Get performance summary for a task"""
+        """Get performance summary for a task; see check_performance for batching"""
         if not stats:
             return {}
         
@@ -176,6 +333,8 @@ class SystemHealthMonitor:
     def __init__(self):
         self.health_checks = []
         self.last_check = None
+        self._metrics = None
+        self._metrics_ts = 0.0
     
     def add_health_check(self, name: str, check_function: Callable):
         """Add a health check function"""
@@ -217,27 +376,30 @@ class SystemHealthMonitor:
     
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get system-wide metrics"""
+        now = time.monotonic()
+        if self._metrics is not None and now - self._metrics_ts < SYSTEM_METRICS_TTL:
+            return self._metrics
+        
         try:
-            import psutil
-            
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Get system metrics; CPU is the non-blocking delta since last call
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
-            # Get task metrics
-            active_tasks = AutomationTask.objects.filter(status__in=['PENDING', 'RUNNING']).count()
-            completed_today = AutomationTask.objects.filter(
-                created_at__date=timezone.now().date(),
-                status='COMPLETED'
-            ).count()
-            
-            failed_today = AutomationTask.objects.filter(
-                created_at__date=timezone.now().date(),
-                status='FAILED'
-            ).count()
+            # Get task metrics in one query; a half-open range on created_at
+            # can use its index, unlike the DATE() wrapped __date lookup
+            today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            today = Q(created_at__gte=today_start, created_at__lt=today_start + timedelta(days=1))
+            counts = AutomationTask.objects.aggregate(
+                active=Count('id', filter=Q(status__in=['PENDING', 'RUNNING'])),
+                completed=Count('id', filter=today & Q(status='COMPLETED')),
+                failed=Count('id', filter=today & Q(status='FAILED'))
+            )
+            active_tasks = counts['active']
+            completed_today = counts['completed']
+            failed_today = counts['failed']
             
-            return {
+            self._metrics = {
                 'cpu_percent': cpu_percent,
                 'memory_percent': memory.percent,
                 'memory_available_gb': memory.available / (1024**3),
@@ -248,6 +410,8 @@ class SystemHealthMonitor:
                 'failed_today': failed_today,
                 'success_rate_today': completed_today / (completed_today + failed_today) if (completed_today + failed_today) > 0 else 0
             }
+            self._metrics_ts = now
+            return self._metrics
         except Exception as e:
             logger.error(f"Error getting system metrics: {e}")
             return {}
@@ -262,11 +426,17 @@ class RealTimeMonitor:
     
     def start_monitoring(self, task: AutomationTask):
         """Start monitoring a task"""
+        now = timezone.now()
+        now_iso = now.isoformat()
+        # ISO strings are kept next to the datetimes so polling readers
+        # only copy them; they change once per status update
         self.active_monitors[str(task.id)] = {
             'task': task,
-            'start_time': timezone.now(),
-            'last_update': timezone.now(),
-            'status_history': []
+            'start_time': now,
+            'last_update': now,
+            'start_time_iso': now_iso,
+            'last_update_iso': now_iso,
+            'status_history': deque(maxlen=STATUS_HISTORY_SIZE)
         }
         logger.info(f"Started monitoring task {task.id}")
     
@@ -281,17 +451,15 @@ class RealTimeMonitor:
         task_id = str(task.id)
         if task_id in self.active_monitors:
             monitor = self.active_monitors[task_id]
-            monitor['last_update'] = timezone.now()
+            now = timezone.now()
+            monitor['last_update'] = now
+            monitor['last_update_iso'] = now.isoformat()
             monitor['status_history'].append({
                 'status': task.status,
-                'timestamp': timezone.now().isoformat(),
+                'timestamp': monitor['last_update_iso'],
                 'pages_visited': task.total_pages_visited,
                 'errors': task.total_errors
             })
-            
-            # Keep only last 10 status updates
-            if len(monitor['status_history']) > 10:
-                monitor['status_history'] = monitor['status_history'][-10:]
     
     def get_monitoring_data(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get monitoring data for a task"""
@@ -305,10 +473,10 @@ class RealTimeMonitor:
                 task_id: {
                     'task_name': monitor['task'].name,
                     'status': monitor['task'].status,
-                    'start_time': monitor['start_time'].isoformat(),
-                    'last_update': monitor['last_update'].isoformat(),
+                    'start_time': monitor['start_time_iso'],
+                    'last_update': monitor['last_update_iso'],
                     'duration_minutes': (monitor['last_update'] - monitor['start_time']).total_seconds() / 60,
-                    'status_history': monitor['status_history'][-5:]  # Last 5 updates
+                    'status_history': latest(monitor['status_history'], 5)  # Last 5 updates
                 }
                 for task_id, monitor in self.active_monitors.items()
             }
@@ -320,13 +488,10 @@ def create_default_rules(alert_manager: AlertManager):
     """Create default monitoring rules"""
     
     # Task stuck rule
-    def task_stuck_condition(task: AutomationTask, stats: AutomationStats = None) -> bool:
-        if task.status == 'RUNNING' and task.started_at:
-            duration = (timezone.now() - task.started_at).total_seconds() / 60
-            return duration > 30  # 30 minutes
-        return False
+    def task_stuck_condition(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx) -> bool:
+        return task.status == 'RUNNING' and ctx.duration_s is not None and ctx.duration_s > 30 * 60
     
-    def task_stuck_action(task: AutomationTask, stats: AutomationStats = None):
+    def task_stuck_action(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx):
         alert_manager.send_alert(
             task,
             f"Task has been running for over 30 minutes",
@@ -336,21 +501,19 @@ def create_default_rules(alert_manager: AlertManager):
     alert_manager.add_rule(MonitoringRule(
         'task_stuck',
         task_stuck_condition,
-        task_stuck_action
+        task_stuck_action,
+        trigger_on={'RUNNING'}
     ))
     
     # High error rate rule
-    def high_error_rate_condition(task: AutomationTask, stats: AutomationStats = None) -> bool:
-        if stats and stats.total_requests > 10:
-            error_rate = stats.failed_requests / stats.total_requests
-            return error_rate > 0.5  # 50% error rate
-        return False
+    def high_error_rate_condition(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx) -> bool:
+        # 50% error rate over more than 10 requests
+        return stats is not None and stats.total_requests > 10 and ctx.error_rate > 0.5
     
-    def high_error_rate_action(task: AutomationTask, stats: AutomationStats = None):
-        error_rate = stats.failed_requests / stats.total_requests
+    def high_error_rate_action(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx):
         alert_manager.send_alert(
             task,
-            f"High error rate detected: {error_rate:.1%}",
+            f"High error rate detected: {ctx.error_rate:.1%}",
             'error'
         )
     
@@ -361,10 +524,10 @@ def create_default_rules(alert_manager: AlertManager):
     ))
     
     # CAPTCHA detection rule
-    def captcha_detected_condition(task: AutomationTask, stats: AutomationStats = None) -> bool:
+    def captcha_detected_condition(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx) -> bool:
         return task.status == 'CAPTCHA_DETECTED'
     
-    def captcha_detected_action(task: AutomationTask, stats: AutomationStats = None):
+    def captcha_detected_action(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx):
         alert_manager.send_alert(
             task,
             "CAPTCHA detected - human intervention required",
@@ -374,14 +537,15 @@ def create_default_rules(alert_manager: AlertManager):
     alert_manager.add_rule(MonitoringRule(
         'captcha_detected',
         captcha_detected_condition,
-        captcha_detected_action
+        captcha_detected_action,
+        trigger_on={'CAPTCHA_DETECTED'}
     ))
     
     # Task completion rule
-    def task_completed_condition(task: AutomationTask, stats: AutomationStats = None) -> bool:
+    def task_completed_condition(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx) -> bool:
         return task.status == 'COMPLETED'
     
-    def task_completed_action(task: AutomationTask, stats: AutomationStats = None):
+    def task_completed_action(task: AutomationTask, stats: AutomationStats, ctx: EvalCtx):
         pages_visited = task.total_pages_visited
         errors = task.total_errors
         alert_manager.send_alert(
@@ -393,7 +557,8 @@ def create_default_rules(alert_manager: AlertManager):
     alert_manager.add_rule(MonitoringRule(
         'task_completed',
         task_completed_condition,
-        task_completed_action
+        task_completed_action,
+        trigger_on={'COMPLETED'}
     ))
 
 
@@ -409,9 +574,4 @@ create_default_rules(alert_manager)
 # Compatibility functions for the views
 def get_system_metrics() -> Dict[str, Any]:
     """Get current system resource usage metrics."""
-    health_monitor = HealthMonitor()
-    return health_monitor.get_system_metrics()
-
-def alert_manager():
-    """Get the alert manager instance."""
-    return AlertManager()
+    return system_health_monitor.get_system_metrics()
@@ -0,0 +1,41 @@
+"""
+Pagination classes for the runner API
+"""
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the indexed created_at column.
+
+    Avoids the COUNT(*) and growing OFFSET scans of page-number pagination;
+    the cursor encodes the created_at of the last row served. A cursor can
+    only page through a non-null, unique-ish column (a NULL in the last row
+    is encoded as the string 'None' and breaks the next page), so any other
+    requested ordering falls back to page-number pagination.
+    """
+    ordering = '-created_at'
+    page_size = 25
+    cursor_orderings = ('created_at', '-created_at')
+
+    fallback = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering[0] in self.cursor_orderings:
+            return super().paginate_queryset(queryset, request, view)
+
+        # The queryset is already ordered by OrderingFilter
+        self.fallback = PageNumberPagination()
+        self.fallback.page_size = self.page_size
+        return self.fallback.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.fallback is not None:
+            return self.fallback.to_html()
+        return super().to_html()
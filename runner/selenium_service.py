@@ -29,9 +29,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
 
 from .models import AutomationTask, PageEvent, CaptchaEvent, AutomationLog, AutomationStats
+from .monitoring import PerformanceMonitor
 
 logger = logging.getLogger(__name__)
 
+# Log rows are buffered and written with one INSERT per batch
+LOG_BATCH_SIZE = 500
+
 
 class SeleniumAutomationService:
     """Comprehensive Selenium automation service with CAPTCHA detection"""
@@ -43,14 +47,18 @@ class SeleniumAutomationService:
             'start_time': time.time(),
             'pages_visited': 0,
             'errors': 0,
+            'successful_requests': 0,
             'captcha_detections': 0,
             'memory_peak': 0,
             'cpu_peak': 0,
         }
+        self._log_buffer: List[AutomationLog] = []
+        # Reused so cpu_percent() measures usage since the previous sample
+        self._psutil_proc = psutil.Process()
         
     def _log(self, level: str, message: str, **kwargs):
         """Log message to database and console"""
-        AutomationLog.objects.create(
+        self._log_buffer.append(AutomationLog(
             task=self.task,
             level=level,
             message=message,
@@ -58,15 +66,25 @@ class SeleniumAutomationService:
             function=kwargs.get('function', ''),
             line_number=kwargs.get('line_number', None),
             metadata=kwargs.get('metadata', {})
-        )
+        ))
+        if len(self._log_buffer) >= LOG_BATCH_SIZE:
+            self._flush_logs()
         getattr(logger, level.lower(), logger.info)(message)
     
+    def _flush_logs(self):
+        """Write buffered log rows with a single batched INSERT"""
+        if not self._log_buffer:
+            return
+        pending, self._log_buffer = self._log_buffer, []
+        try:
+            AutomationLog.objects.bulk_create(pending, batch_size=LOG_BATCH_SIZE)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(pending)} automation logs: {e}")
+    
     def _update_stats(self):
         """Update resource usage statistics"""
         try:
-            process = psutil.Process()
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            cpu_percent = process.cpu_percent()
+            cpu_percent, memory_mb = PerformanceMonitor.sample(self._psutil_proc)
             
             self.stats['memory_peak'] = max(self.stats['memory_peak'], memory_mb)
             self.stats['cpu_peak'] = max(self.stats['cpu_peak'], cpu_percent)
@@ -450,6 +468,9 @@ class SeleniumAutomationService:
                         self.stats['errors'] += 1
                         continue
                     
+                    # Counted directly: errors also include loads that never produced a page
+                    self.stats['successful_requests'] += 1
+                    
                     # Check for CAPTCHA
                     if self._handle_captcha_detection(page_event):
                         self._log('WARNING', "CAPTCHA detected - stopping automation")
@@ -487,12 +508,17 @@ class SeleniumAutomationService:
             
             self.task.total_pages_visited = self.stats['pages_visited']
             self.task.total_errors = self.stats['errors']
-            self.task.save(update_fields=['status', 'finished_at', 'total_pages_visited', 'total_errors'])
+            self.task.total_captcha_detections = self.stats['captcha_detections']
+            self.task.total_successful_requests = self.stats['successful_requests']
+            self.task.save(update_fields=[
+                'status', 'finished_at', 'total_pages_visited', 'total_errors',
+                'total_captcha_detections', 'total_successful_requests'
+            ])
             
             # Update or create stats
             stats, created = AutomationStats.objects.get_or_create(task=self.task)
             stats.total_requests = self.stats['pages_visited']
-            stats.successful_requests = self.stats['pages_visited'] - self.stats['errors']
+            stats.successful_requests = self.stats['successful_requests']
             stats.failed_requests = self.stats['errors']
             stats.captcha_detections = self.stats['captcha_detections']
             stats.memory_peak = self.stats['memory_peak']
@@ -517,6 +543,7 @@ class SeleniumAutomationService:
                     self._log('INFO', "WebDriver closed")
                 except Exception as e:
                     self._log('ERROR', f"Error closing WebDriver: {e}")
+            self._flush_logs()
 
 
 def run_automation_task(task_id: str):
@@ -40,7 +40,7 @@ class AutomationLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = AutomationLog
         fields = [
-            'id', 'level', 'message', 'timestamp', 'module',
+            'id', 'level', 'category', 'message', 'timestamp', 'module',
             'function', 'line_number', 'metadata'
         ]
         read_only_fields = ['id', 'timestamp']
@@ -0,0 +1,40 @@
+"""
+Signal handlers for cache invalidation
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import AutomationTask, AutomationStats
+
+DAILY_REPORT_CACHE_PREFIX = 'daily_report'
+
+# Statuses that change the daily report figures
+REPORTED_STATUSES = {'COMPLETED', 'FAILED', 'CAPTCHA_DETECTED', 'CANCELLED'}
+
+
+def daily_report_cache_key(day: date) -> str:
+    """Cache key for the daily report whose window starts on ``day``"""
+    return f'{DAILY_REPORT_CACHE_PREFIX}:{day.isoformat()}'
+
+
+@receiver(post_save, sender=AutomationTask)
+def invalidate_daily_report(sender, instance, created, **kwargs):
+    """Drop cached daily reports that may include this task"""
+    if not created and instance.status not in REPORTED_STATUSES:
+        return
+    
+    # Reports cover whole calendar days, keyed by the day they describe. Delete
+    # after commit, or a concurrent reader could re-cache the pre-commit figures
+    key = daily_report_cache_key(instance.created_at.date())
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_save, sender=AutomationTask)
+def create_task_stats(sender, instance, created, raw=False, **kwargs):
+    """Give every task its stats row up front so readers never write"""
+    if created and not raw:
+        AutomationStats.objects.create(task=instance)
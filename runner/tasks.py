@@ -26,7 +26,9 @@ def cleanup_old_tasks():
     """
     from datetime import timedelta
     from django.utils import timezone
+    from django.core.files.storage import default_storage
     from .models import AutomationTask
+    from .enhanced_selenium_service import task_log_path
     import os
     
     try:
@@ -37,24 +39,30 @@ def cleanup_old_tasks():
             status__in=['COMPLETED', 'FAILED', 'CANCELLED']
         )
         
-        count = 0
-        for task in old_tasks:
-            # Delete associated files
-            for event in task.events.all():
-                if event.screenshot:
-                    try:
-                        os.remove(event.screenshot.path)
-                    except (OSError, ValueError):
-                        pass
-                if event.html_content:
-                    try:
-                        os.remove(event.html_content.path)
-                    except (OSError, ValueError):
-                        pass
-            
-            # Delete task
-            task.delete()
-            count += 1
+        # Gather file names in one query before the rows go away
+        file_names = [
+            name
+            for names in old_tasks.values_list('events__screenshot', 'events__html_content')
+            for name in names
+            if name
+        ]
+        task_ids = list(old_tasks.values_list('id', flat=True))
+        
+        # Delete tasks (Django issues one DELETE per cascaded table)
+        _, deleted = old_tasks.delete()
+        count = deleted.get(AutomationTask._meta.label, 0)
+        
+        # Delete associated files, including each task's JSONL run log
+        for name in file_names:
+            try:
+                os.remove(default_storage.path(name))
+            except (OSError, ValueError):
+                pass
+        for task_id in task_ids:
+            try:
+                os.remove(task_log_path(task_id))
+            except OSError:
+                pass
         
         logger.info(f"Cleaned up {count} old tasks")
         return f"Cleaned up {count} old tasks"
@@ -124,7 +132,7 @@ def optimize_performance_task(self, task_id: str):
     This would analyze past runs and suggest config changes.
     """
     try:
-        task = AutomationTask.objects.get(id=task_id)
+        task = AutomationTask.objects.select_related('stats').get(id=task_id)
         logger.info(f"Analyzing performance for task {task_id} for optimization.")
 
         # Placeholder for actual AI/ML logic
@@ -0,0 +1,203 @@
+"""
+Tests for the runner app
+"""
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .enhanced_selenium_service import task_log_path
+from .enhanced_tasks import cleanup_task_batch
+from .enhanced_views import EnhancedAutomationTaskViewSet
+from .models import AutomationTask, AutomationStats, PageEvent
+from .pagination import TaskCursorPagination
+from .signals import daily_report_cache_key
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_task(user, **kwargs):
+    return AutomationTask.objects.create(
+        start_url='https://example.com/', created_by=user, **kwargs
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskSignalTests(TestCase):
+    """post_save receivers in runner.signals"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        cache.clear()
+
+    def test_stats_row_created_with_task(self):
+        task = make_task(self.user)
+        self.assertTrue(AutomationStats.objects.filter(task=task).exists())
+
+    def test_stats_row_not_recreated_on_update(self):
+        task = make_task(self.user)
+        task.name = 'renamed'
+        task.save()
+        self.assertEqual(AutomationStats.objects.filter(task=task).count(), 1)
+
+    def test_daily_report_invalidated_after_commit(self):
+        task = make_task(self.user, status='RUNNING')
+        key = daily_report_cache_key(task.created_at.date())
+        cache.set(key, 'report')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            task.status = 'COMPLETED'
+            task.save(update_fields=['status'])
+            # Readers must not see an empty cache before the new status is committed
+            self.assertEqual(cache.get(key), 'report')
+
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(key))
+
+    def test_unreported_status_keeps_daily_report(self):
+        task = make_task(self.user)
+        key = daily_report_cache_key(task.created_at.date())
+        cache.set(key, 'report')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'RUNNING'
+            task.save(update_fields=['status'])
+
+        self.assertEqual(cache.get(key), 'report')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskDurationTests(TestCase):
+    """AutomationTask.save() keeps duration_seconds in step with the timestamps"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.started = timezone.now() - timedelta(minutes=5)
+
+    def test_full_save_sets_duration(self):
+        task = make_task(self.user, started_at=self.started,
+                         finished_at=self.started + timedelta(seconds=90))
+        task.refresh_from_db()
+        self.assertEqual(task.duration_seconds, 90)
+        self.assertEqual(task.duration, timedelta(seconds=90))
+
+    def test_update_fields_with_timestamp_writes_duration(self):
+        task = make_task(self.user, started_at=self.started)
+        task.status = 'COMPLETED'
+        task.finished_at = self.started + timedelta(seconds=30)
+        task.save(update_fields=['status', 'finished_at'])
+
+        task.refresh_from_db()
+        self.assertEqual(task.duration_seconds, 30)
+
+    def test_update_fields_without_timestamps_leave_duration(self):
+        task = make_task(self.user, started_at=self.started,
+                         finished_at=self.started + timedelta(seconds=30))
+        AutomationTask.objects.filter(pk=task.pk).update(duration_seconds=5)
+
+        task.name = 'renamed'
+        task.save(update_fields=['name'])
+
+        task.refresh_from_db()
+        self.assertEqual(task.duration_seconds, 5)
+
+    def test_cleared_timestamps_reset_duration(self):
+        task = make_task(self.user, started_at=self.started,
+                         finished_at=self.started + timedelta(seconds=30))
+        task.started_at = None
+        task.finished_at = None
+        task.save(update_fields=['started_at', 'finished_at'])
+
+        task.refresh_from_db()
+        self.assertIsNone(task.duration_seconds)
+        self.assertIsNone(task.duration)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CleanupTaskBatchTests(TestCase):
+    """enhanced_tasks.cleanup_task_batch removes tombstoned tasks and their files"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = User.objects.create_user('owner')
+
+    def _write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x')
+        return path
+
+    def test_removes_tombstoned_tasks_and_files(self):
+        task = make_task(self.user, status='TOMBSTONED', tombstoned_at=timezone.now())
+        screenshot = self._write(Path(self.media_root) / 'screenshots' / 'page.png')
+        PageEvent.objects.create(task=task, url=task.start_url, screenshot='screenshots/page.png')
+        run_log = self._write(task_log_path(task.id))
+
+        self.assertEqual(cleanup_task_batch(), 1)
+
+        self.assertFalse(AutomationTask.objects.filter(pk=task.pk).exists())
+        self.assertFalse(screenshot.exists())
+        self.assertFalse(run_log.exists())
+
+    def test_keeps_live_tasks(self):
+        task = make_task(self.user, status='COMPLETED')
+        run_log = self._write(task_log_path(task.id))
+
+        self.assertEqual(cleanup_task_batch(), 0)
+
+        self.assertTrue(AutomationTask.objects.filter(pk=task.pk).exists())
+        self.assertTrue(run_log.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch.object(TaskCursorPagination, 'page_size', 2)
+class TaskPaginationTests(TestCase):
+    """EnhancedAutomationTaskViewSet list pagination"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('staff', is_staff=True)
+        for _ in range(3):
+            make_task(self.user)
+        self.factory = APIRequestFactory()
+        self.list_view = EnhancedAutomationTaskViewSet.as_view({'get': 'list'})
+
+    def _get(self, url):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.user)
+        return self.list_view(request)
+
+    def test_default_ordering_uses_cursor(self):
+        response = self._get('/tasks/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('cursor=', response.data['next'])
+
+        next_page = self._get(response.data['next'])
+        self.assertEqual(next_page.status_code, 200)
+        self.assertEqual(len(next_page.data['results']), 1)
+
+    def test_nullable_ordering_falls_back_to_page_numbers(self):
+        # started_at is NULL for every task; a cursor over it cannot be followed
+        response = self._get('/tasks/?ordering=started_at')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertIn('page=2', response.data['next'])
+
+        next_page = self._get(response.data['next'])
+        self.assertEqual(next_page.status_code, 200)
+        self.assertEqual(len(next_page.data['results']), 1)
@@ -10,7 +10,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Sum, Avg, Count
+from django.db.models import Sum, Avg, Count, Min, Q
 from django.conf import settings
 from django.db import connection
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
@@ -248,11 +248,18 @@ class AutomationTaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def enhanced_dashboard(self, request):
         """Get enhanced dashboard data."""
-        total_tasks = AutomationTask.objects.count()
-        running_tasks = AutomationTask.objects.filter(status=AutomationTask.RUNNING).count()
-        captcha_tasks = AutomationTask.objects.filter(status=AutomationTask.CAPTCHA_DETECTED).count()
-        completed_tasks = AutomationTask.objects.filter(status=AutomationTask.COMPLETED).count()
-        failed_tasks = AutomationTask.objects.filter(status=AutomationTask.FAILED).count()
+        counts = AutomationTask.objects.aggregate(
+            total=Count('id'),
+            running=Count('id', filter=Q(status=AutomationTask.RUNNING)),
+            captcha=Count('id', filter=Q(status=AutomationTask.CAPTCHA_DETECTED)),
+            completed=Count('id', filter=Q(status=AutomationTask.COMPLETED)),
+            failed=Count('id', filter=Q(status=AutomationTask.FAILED)),
+        )
+        total_tasks = counts['total']
+        running_tasks = counts['running']
+        captcha_tasks = counts['captcha']
+        completed_tasks = counts['completed']
+        failed_tasks = counts['failed']
 
         avg_runtime = AutomationStats.objects.aggregate(Avg('total_runtime_seconds'))['total_runtime_seconds__avg']
         total_pages_visited = AutomationStats.objects.aggregate(Sum('pages_visited'))['pages_visited__sum']
@@ -463,11 +470,18 @@ class SystemViewSet(viewsets.ViewSet):
 
         system_metrics = get_system_metrics()
 
-        active_tasks = AutomationTask.objects.filter(status=AutomationTask.RUNNING).count()
-        pending_tasks = AutomationTask.objects.filter(status=AutomationTask.PENDING).count()
-        failed_tasks = AutomationTask.objects.filter(status=AutomationTask.FAILED).count()
+        counts = AutomationTask.objects.aggregate(
+            active=Count('id', filter=Q(status=AutomationTask.RUNNING)),
+            pending=Count('id', filter=Q(status=AutomationTask.PENDING)),
+            failed=Count('id', filter=Q(status=AutomationTask.FAILED)),
+            first_created=Min('created_at'),
+        )
+        active_tasks = counts['active']
+        pending_tasks = counts['pending']
+        failed_tasks = counts['failed']
 
-        uptime_seconds = (timezone.now() - AutomationTask.objects.order_by('created_at').first().created_at).total_seconds() if AutomationTask.objects.exists() else 0
+        first_created = counts['first_created']
+        uptime_seconds = (timezone.now() - first_created).total_seconds() if first_created else 0
 
         return {
             "status": "OK",
@@ -41,7 +41,7 @@ else:
 
 # Start Celery worker in background
 echo "Starting Celery worker..."
-celery -A automation_backend worker -l info &
+celery -A automation_backend worker -l info -Q celery,io &
 CELERY_PID=$!
 
 # Start Django development server